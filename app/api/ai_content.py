@@ -3,16 +3,26 @@ AI Content API Endpoints
 Generate and manage AI content
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
-from fastapi.responses import FileResponse
-from typing import List
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response, Query, Request, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from typing import List, Optional, Dict, Any
+from sqlalchemy import select, update, tuple_
 from docx import Document
 from docx.shared import Inches
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote
+import asyncio
+import io
+import json
 import os
-import tempfile
+import re
+import weakref
+import zipfile
 
+from app.core.etag import compute_etag, conditional_response, json_body
+from app.core.pagination import encode_cursor, decode_cursor
 from app.database import get_db
 from app.models import AIContent, AIContentCreate, AIContentResponse, Topic
 from app.services.ai_service import AIService
@@ -21,22 +31,75 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 PROMPT_FILE_PATH = "ai_prompts/master_prompt.txt"
+DOCX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+DOCX_TEMPLATE_PATH = "ai_prompts/reference.docx"  # Opsiyonel: stilleri hazır şablon
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w \-]+')  # Harf/rakam, boşluk, '-' ve '_' dışındaki her şey
+_CREATED_AT_FORMAT = '%d/%m/%Y %H:%M'
+_EXPORT_CHUNK_SIZE = 64 * 1024
+_BYTE_RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)  # Sabit zip girdi zamanı: aynı içerik her seferinde aynı byte'ları üretir
+
+def _export_timestamp() -> str:
+    """UTC timestamp for export filenames (YYYYmmdd_HHMM) without a strftime call."""
+    now = datetime.now(timezone.utc)
+    return f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}"
+
+def _content_disposition(filename: str) -> str:
+    """Build an attachment header, RFC 5987-encoding non-ASCII filenames."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def get_ai_service(request: Request) -> AIService:
+    """Dependency returning the application-wide AIService created in the lifespan."""
+    return request.app.state.ai_service
+
+# Liste uç noktası sadece response modelinin ihtiyaç duyduğu kolonları çeker
+_LIST_COLUMNS = [getattr(AIContent, name) for name in AIContentResponse.model_fields]
+_LIST_ADAPTER = TypeAdapter(List[AIContentResponse])
 
 @router.get("/", response_model=List[AIContentResponse])
-async def get_ai_contents():
-    """Get all AI generated contents"""
+async def get_ai_contents(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page")
+):
+    """Get AI generated contents, newest first (keyset paginated by created_at, id)"""
     async with get_db() as db:
-        result = await db.execute(select(AIContent).order_by(AIContent.created_at.desc()))
-        contents = result.scalars().all()
-        return contents
+        query = select(*_LIST_COLUMNS)
+        if cursor:
+            # Aynı created_at'e sahip satırlar id ile ayrışır; sayfa sınırında atlanmaz/tekrarlanmaz
+            last_created_at, last_id = decode_cursor(cursor)
+            query = query.where(tuple_(AIContent.created_at, AIContent.id) < tuple_(last_created_at, last_id))
+        query = query.order_by(AIContent.created_at.desc(), AIContent.id.desc()).limit(limit + 1)
+        
+        result = await db.execute(query)
+        rows = result.mappings().all()
+    
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {"X-Next-Cursor": encode_cursor(rows[-1]["created_at"], rows[-1]["id"])}
+    
+    # Satırlar zaten DB şemasına uygun; tekrar doğrulamadan doğrudan JSON'a serialize et
+    contents = [AIContentResponse.model_construct(**row) for row in rows]
+    return Response(content=_LIST_ADAPTER.dump_json(contents), media_type="application/json", headers=headers)
 
-@router.post("/generate")
-async def generate_ai_content(content_data: AIContentCreate, background_tasks: BackgroundTasks):
-    """Generate AI content from liked topic"""
+@router.post("/generate", status_code=202)
+async def generate_ai_content(
+    content_data: AIContentCreate,
+    background_tasks: BackgroundTasks,
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """Queue AI content generation for a liked topic; poll /{id} or /{id}/stream for the result"""
     # Verify topic exists and is liked
     async with get_db() as db:
-        result = await db.execute(select(Topic).where(Topic.id == content_data.topic_id))
-        topic = result.scalar_one_or_none()
+        # Sadece gereken kolonlar: tam Topic satırı ORM nesnesine dönüştürülmez
+        result = await db.execute(
+            select(Topic.status, Topic.title, Topic.description, Topic.content)
+            .where(Topic.id == content_data.topic_id)
+        )
+        topic = result.one_or_none()
         
         if not topic:
             raise HTTPException(status_code=404, detail="Topic not found")
@@ -61,38 +124,192 @@ async def generate_ai_content(content_data: AIContentCreate, background_tasks: B
         await db.refresh(ai_content)
     
     # Start generation in background
-    background_tasks.add_task(_generate_ai_content, ai_content.id, topic.title, topic.description or topic.content or "")
+    background_tasks.add_task(_generate_ai_content, ai_service, ai_content.id, topic.title, topic.description or topic.content or "")
     
     return {"success": True, "ai_content_id": ai_content.id, "message": "AI generation started"}
 
-async def _generate_ai_content(ai_content_id: str, topic_title: str, topic_content: str):
+async def _generate_ai_content(ai_service: AIService, ai_content_id: str, topic_title: str, topic_content: str):
     """Background task for AI content generation"""
-    ai_service = AIService()
-    
-    async with get_db() as db:
-        result = await db.execute(select(AIContent).where(AIContent.id == ai_content_id))
-        ai_content = result.scalar_one_or_none()
-        
-        if not ai_content:
-            return
-        
+    try:
         # Generate content
         generation_result = await ai_service.generate_content(topic_title, topic_content)
         
         if generation_result["success"]:
-            ai_content.generated_content = generation_result["generated_content"]
-            ai_content.status = "completed"
-            ai_content.generation_time_seconds = generation_result["metadata"]["generation_time_seconds"]
-            ai_content.content_length = len(generation_result["generated_content"])
+            values = {
+                "generated_content": generation_result["generated_content"],
+                "status": "completed",
+                "generation_time_seconds": generation_result["metadata"]["generation_time_seconds"],
+                "content_length": len(generation_result["generated_content"])
+            }
         else:
-            ai_content.status = "failed"
-            ai_content.generated_content = f"Error: {generation_result['error']}"
+            values = {
+                "status": "failed",
+                "generated_content": f"Error: {generation_result['error']}"
+            }
+        # Başarılı/başarısız fark etmez: /stats doğrulayıcısı bitişleri bu kolondan görür
+        values["completed_at"] = datetime.now(timezone.utc)
         
-        db.add(ai_content)
-        await db.commit()
+        # Write only the changed columns in one UPDATE (no SELECT + ORM hydration)
+        async with get_db() as db:
+            await db.execute(update(AIContent).where(AIContent.id == ai_content_id).values(**values))
+    finally:
+        # Wake up SSE listeners once the final status is committed (or the task died)
+        _notify_generation_finished(ai_content_id)
+
+# Üretim durumunu bekleyen SSE istemcileri: ai_content_id -> üretim bitince set edilen Event.
+# Zayıf referans: son dinleyici (timeout, istemci kopması) Event'i bıraktığında girdi kendiliğinden silinir.
+_generation_waiters: "weakref.WeakValueDictionary[str, asyncio.Event]" = weakref.WeakValueDictionary()
+GENERATION_IN_PROGRESS = ("pending", "generating")
+GENERATION_STREAM_TIMEOUT = 300  # seconds
+
+def _notify_generation_finished(ai_content_id: str):
+    event = _generation_waiters.pop(ai_content_id, None)
+    if event:
+        event.set()
+
+async def _get_generation_status(ai_content_id: str) -> Optional[Dict[str, Any]]:
+    async with get_db() as db:
+        result = await db.execute(
+            select(
+                AIContent.id,
+                AIContent.status,
+                AIContent.content_length,
+                AIContent.generation_time_seconds
+            ).where(AIContent.id == ai_content_id)
+        )
+        row = result.mappings().one_or_none()
+        return dict(row) if row else None
+
+async def _watch_generation(ai_content_id: str, event: asyncio.Event, status: Dict[str, Any]):
+    """Yield a single SSE frame with the final generation status."""
+    if status["status"] in GENERATION_IN_PROGRESS:
+        try:
+            await asyncio.wait_for(event.wait(), timeout=GENERATION_STREAM_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass  # Report whatever state the row is in now
+        status = await _get_generation_status(ai_content_id) or status
+    
+    yield f"event: status\ndata: {json.dumps(status)}\n\n"
+
+@router.get("/{ai_content_id}/stream")
+async def stream_ai_content_status(ai_content_id: str):
+    """Server-Sent Events stream that pushes the generation result instead of polling"""
+    # Register before reading the row so a completion in between is not missed
+    event = _generation_waiters.setdefault(ai_content_id, asyncio.Event())
+    status = await _get_generation_status(ai_content_id)
+    
+    if not status:
+        _notify_generation_finished(ai_content_id)
+        raise HTTPException(status_code=404, detail="AI content not found")
+    
+    if status["status"] not in GENERATION_IN_PROGRESS:
+        _notify_generation_finished(ai_content_id)
+    
+    return StreamingResponse(
+        _watch_generation(ai_content_id, event, status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@lru_cache(maxsize=1)
+def _docx_template_bytes() -> bytes:
+    """Load the export template once (custom reference.docx if present, else python-docx default)."""
+    if os.path.exists(DOCX_TEMPLATE_PATH):
+        with open(DOCX_TEMPLATE_PATH, 'rb') as f:
+            return f.read()
+    buffer = io.BytesIO()
+    Document().save(buffer)
+    return buffer.getvalue()
+
+def _build_docx(ai_content: AIContent) -> io.BytesIO:
+    """Render an AI content record into an in-memory Word document."""
+    doc = Document(io.BytesIO(_docx_template_bytes()))
+    
+    # Add title
+    title = doc.add_heading(ai_content.title, 0)
+    title.alignment = 1  # Center alignment
+    
+    # Add metadata
+    doc.add_heading('İçerik Bilgileri', level=1)
+    metadata_rows = [
+        ('Oluşturma Tarihi:', ai_content.created_at.strftime(_CREATED_AT_FORMAT)),
+        ('AI Model:', ai_content.ai_model),
+        ('İçerik Uzunluğu:', f'{ai_content.content_length} karakter'),
+        ('Üretim Süresi:', f'{ai_content.generation_time_seconds} saniye'),
+    ]
+    metadata_table = doc.add_table(rows=len(metadata_rows), cols=2)
+    metadata_table.style = 'Table Grid'
+    
+    # row.cells is resolved once per row instead of a table.cell() grid lookup per cell
+    for row, (label, value) in zip(metadata_table.rows, metadata_rows):
+        label_cell, value_cell = row.cells
+        label_cell.text = label
+        value_cell.text = value
+    
+    # Add generated content
+    doc.add_heading('YouTube Video Scripti', level=1)
+    content_para = doc.add_paragraph(ai_content.generated_content)
+    content_para.alignment = 0  # Left alignment
+    
+    # Add original topic info
+    doc.add_heading('Kaynak Bilgisi', level=1)
+    source_para = doc.add_paragraph(f"Orijinal İçerik: {ai_content.content}")
+    source_para.alignment = 0
+    
+    # Serialize in memory - no temp file to write, re-read and clean up
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return _normalize_zip(buffer)
+
+def _normalize_zip(buffer: io.BytesIO) -> io.BytesIO:
+    """Rewrite the docx zip with fixed entry timestamps so identical content yields identical bytes.
+
+    python-docx stamps every zip entry with the current time; without this the ETag (and
+    therefore Range resumption) would change on every render.
+    """
+    normalized = io.BytesIO()
+    with zipfile.ZipFile(buffer) as src, zipfile.ZipFile(normalized, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            dst.writestr(zipfile.ZipInfo(item.filename, date_time=_ZIP_EPOCH), src.read(item.filename),
+                         compress_type=zipfile.ZIP_DEFLATED)
+    return normalized
+
+def _parse_byte_range(range_header: Optional[str], size: int) -> Optional[tuple]:
+    """Parse a single 'bytes=start-end' Range header into inclusive offsets.
+
+    Returns None when there is no usable range (the full body is served, which
+    RFC 9110 allows for multi-range or malformed headers).
+    """
+    if not range_header:
+        return None
+    match = _BYTE_RANGE_RE.match(range_header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={'Content-Range': f'bytes */{size}'})
+    return start, end
+
+def _iter_buffer(buffer: io.BytesIO, start: int, length: int):
+    """Yield the requested slice of the buffer in fixed-size chunks."""
+    buffer.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = buffer.read(min(_EXPORT_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
 
 @router.get("/{ai_content_id}/export/word")
-async def export_ai_content_to_word(ai_content_id: str):
+async def export_ai_content_to_word(ai_content_id: str, request: Request):
     """Export AI content to Word document"""
     async with get_db() as db:
         result = await db.execute(select(AIContent).where(AIContent.id == ai_content_id))
@@ -105,56 +322,45 @@ async def export_ai_content_to_word(ai_content_id: str):
             raise HTTPException(status_code=400, detail="AI content is not completed yet")
     
     try:
-        # Create Word document
-        doc = Document()
-        
-        # Add title
-        title = doc.add_heading(ai_content.title, 0)
-        title.alignment = 1  # Center alignment
-        
-        # Add metadata
-        doc.add_heading('İçerik Bilgileri', level=1)
-        metadata_table = doc.add_table(rows=4, cols=2)
-        metadata_table.style = 'Table Grid'
-        
-        metadata_table.cell(0, 0).text = 'Oluşturma Tarihi:'
-        metadata_table.cell(0, 1).text = ai_content.created_at.strftime('%d/%m/%Y %H:%M')
+        # python-docx XML/zip serialization is CPU-bound; keep it off the event loop
+        buffer = await asyncio.to_thread(_build_docx, ai_content)
         
-        metadata_table.cell(1, 0).text = 'AI Model:'
-        metadata_table.cell(1, 1).text = ai_content.ai_model
-        
-        metadata_table.cell(2, 0).text = 'İçerik Uzunluğu:'
-        metadata_table.cell(2, 1).text = f'{ai_content.content_length} karakter'
-        
-        metadata_table.cell(3, 0).text = 'Üretim Süresi:'
-        metadata_table.cell(3, 1).text = f'{ai_content.generation_time_seconds} saniye'
-        
-        # Add generated content
-        doc.add_heading('YouTube Video Scripti', level=1)
-        content_para = doc.add_paragraph(ai_content.generated_content)
-        content_para.alignment = 0  # Left alignment
-        
-        # Add original topic info
-        doc.add_heading('Kaynak Bilgisi', level=1)
-        source_para = doc.add_paragraph(f"Orijinal İçerik: {ai_content.content}")
-        source_para.alignment = 0
+        # Create safe filename
+        safe_title = _UNSAFE_FILENAME_RE.sub('', ai_content.title).rstrip()
+        filename = f"{safe_title[:50]}_AI_Content_{_export_timestamp()}.docx"
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-            doc.save(tmp_file.name)
-            tmp_filename = tmp_file.name
+        size = buffer.getbuffer().nbytes
+        etag = compute_etag(buffer.getbuffer())
+        headers = {
+            'Content-Disposition': _content_disposition(filename),
+            'Accept-Ranges': 'bytes',
+            'ETag': etag
+        }
+        status_code = 200
+        start, end = 0, size - 1
         
-        # Create safe filename
-        safe_title = "".join(c for c in ai_content.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{safe_title[:50]}_AI_Content_{datetime.now().strftime('%Y%m%d_%H%M')}.docx"
+        # Resume support: a single byte range. The render is deterministic, so the ETag is
+        # stable; a present but stale If-Range falls back to the full document (RFC 9110)
+        byte_range = None
+        if_range = request.headers.get('if-range')
+        if if_range is None or if_range == etag:
+            byte_range = _parse_byte_range(request.headers.get('range'), size)
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        headers['Content-Length'] = str(end - start + 1)
         
-        return FileResponse(
-            path=tmp_filename,
-            filename=filename,
-            media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            background=lambda: os.unlink(tmp_filename)  # Clean up temp file after sending
+        # Stream in chunks so the socket send does not need one contiguous copy
+        return StreamingResponse(
+            _iter_buffer(buffer, start, end - start + 1),
+            status_code=status_code,
+            media_type=DOCX_MEDIA_TYPE,
+            headers=headers
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Word export failed: {e}")
         raise HTTPException(status_code=500, detail=f"Word export failed: {str(e)}")
@@ -175,18 +381,39 @@ async def delete_ai_content(ai_content_id: str):
         return {"success": True, "message": "AI content deleted successfully"}
 
 @router.get("/test")
-async def test_ai_connection():
+async def test_ai_connection(ai_service: AIService = Depends(get_ai_service)):
     """Test AI service connection"""
-    ai_service = AIService()
     return await ai_service.test_connection() 
 
+# master_prompt.txt önbelleği: (içerik, mtime) - dosya değişmedikçe diskten okunmaz
+_prompt_cache: Optional[tuple] = None
+
+def _read_prompt_file() -> str:
+    with open(PROMPT_FILE_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _write_prompt_file(prompt: str) -> None:
+    """Write via a temp file + os.replace so readers never see a partial prompt."""
+    os.makedirs("ai_prompts", exist_ok=True)
+    tmp_path = PROMPT_FILE_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prompt)
+    os.replace(tmp_path, PROMPT_FILE_PATH)
+
+async def _load_prompt() -> str:
+    """Return the master prompt, re-reading the file only when its mtime changed."""
+    global _prompt_cache
+    mtime = os.stat(PROMPT_FILE_PATH).st_mtime  # FileNotFoundError propagates to the caller
+    if _prompt_cache is None or _prompt_cache[1] != mtime:
+        _prompt_cache = (await asyncio.to_thread(_read_prompt_file), mtime)
+    return _prompt_cache[0]
+
 @router.get("/prompt")
-async def get_ai_prompt():
+async def get_ai_prompt(request: Request):
     """Get the current master AI prompt"""
     try:
-        with open(PROMPT_FILE_PATH, 'r', encoding='utf-8') as f:
-            prompt = f.read()
-        return {"prompt": prompt}
+        prompt = await _load_prompt()
+        return conditional_response(request, json_body({"prompt": prompt}))
     except FileNotFoundError:
         return {"prompt": ""}
     except Exception as e:
@@ -199,12 +426,27 @@ async def save_ai_prompt(request: dict):
     prompt = request.get('prompt')
     if prompt is None:
         raise HTTPException(status_code=400, detail="Prompt content is missing")
+    global _prompt_cache
     try:
-        # Ensure directory exists
-        os.makedirs("ai_prompts", exist_ok=True)
-        with open(PROMPT_FILE_PATH, 'w', encoding='utf-8') as f:
-            f.write(prompt)
+        await asyncio.to_thread(_write_prompt_file, prompt)
+        _prompt_cache = (prompt, os.stat(PROMPT_FILE_PATH).st_mtime)
         return {"success": True, "message": "Prompt saved successfully"}
     except Exception as e:
         logger.error(f"Error writing prompt file: {e}")
-        raise HTTPException(status_code=500, detail="Could not save prompt file") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Could not save prompt file") 
+
+# /test ve /prompt'tan sonra tanımlanır; aksi halde bu yol onları gölgeler
+@router.get("/{ai_content_id}", response_model=AIContentResponse)
+async def get_ai_content(ai_content_id: str):
+    """Get a single AI content (poll target after POST /generate)"""
+    async with get_db() as db:
+        result = await db.execute(select(*_LIST_COLUMNS).where(AIContent.id == ai_content_id))
+        row = result.mappings().one_or_none()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="AI content not found")
+    
+    return Response(
+        content=AIContentResponse.model_construct(**row).model_dump_json(),
+        media_type="application/json"
+    )
@@ -2,26 +2,65 @@
 Settings API Endpoints
 Get and update application settings
 """
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Dict, Any, List, Optional
+import asyncio
 import json
 import os
 from app.core.config import get_settings as get_config_settings
 from app.core.config import get_database_path
+from app.core.etag import compute_etag, conditional_response, json_body
 from app.database import engine, init_database
 
 router = APIRouter()
 
 SETTINGS_FILE = "settings.json"
 
+# settings.json bellekte tutulur; dosyanın mtime'ı değişmedikçe diskten tekrar okunmaz
+_settings_cache: Optional[Dict[str, Any]] = None
+_settings_mtime: float = 0.0
+_settings_lock = asyncio.Lock()
+
+def _read_settings_file() -> Dict[str, Any]:
+    with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_settings_file(payload: str) -> None:
+    """Write to a temp file and swap it in so readers never see a partial file."""
+    tmp_path = SETTINGS_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(payload)
+    os.replace(tmp_path, SETTINGS_FILE)
+
+async def _load_settings() -> Optional[Dict[str, Any]]:
+    """Return a copy of settings.json (None if missing), reloading only when the file changed."""
+    global _settings_cache, _settings_mtime
+    try:
+        mtime = os.stat(SETTINGS_FILE).st_mtime
+    except FileNotFoundError:
+        return None
+
+    async with _settings_lock:
+        if _settings_cache is None or mtime != _settings_mtime:
+            _settings_cache = await asyncio.to_thread(_read_settings_file)
+            _settings_mtime = mtime
+        return dict(_settings_cache)
+
+async def _save_settings(settings_data: Dict[str, Any]) -> None:
+    """Persist settings atomically and refresh the in-memory cache."""
+    global _settings_cache, _settings_mtime
+    payload = json.dumps(settings_data, indent=2, ensure_ascii=False)
+    async with _settings_lock:
+        await asyncio.to_thread(_write_settings_file, payload)
+        _settings_cache = dict(settings_data)
+        _settings_mtime = os.stat(SETTINGS_FILE).st_mtime
+
 @router.get("/")
-async def get_settings() -> Dict[str, Any]:
+async def get_settings(request: Request) -> Response:
     """Get current application settings"""
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
-        else:
+        settings_data = await _load_settings()
+        if settings_data is None:
             # Default settings if file doesn't exist
             settings_data = {
                 "scrape_schedule_hour": 7,
@@ -44,7 +83,7 @@ async def get_settings() -> Dict[str, Any]:
             "debug_mode": sys_settings.debug
         })
 
-        return settings_data
+        return conditional_response(request, json_body(settings_data))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Settings okuma hatası: {str(e)}")
@@ -54,17 +93,13 @@ async def update_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
     """Update application settings"""
     try:
         # Read current settings
-        current_settings = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                current_settings = json.load(f)
+        current_settings = await _load_settings() or {}
 
         # Update with new values
         current_settings.update(settings)
 
         # Save to file
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(current_settings, f, indent=2, ensure_ascii=False)
+        await _save_settings(current_settings)
 
         return {
             "success": True,
@@ -75,31 +110,41 @@ async def update_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Settings güncelleme hatası: {str(e)}")
 
+# Model listesi statik: gövde ve ETag bir kez hesaplanır
+AI_MODELS = {
+    "models": [
+        {
+            "id": "gemini-2.0-flash-exp",
+            "name": "Gemini 2.0 Flash (Experimental)",
+            "description": "En hızlı ve gelişmiş model",
+            "recommended": True
+        },
+        {
+            "id": "gemini-1.5-pro",
+            "name": "Gemini 1.5 Pro",
+            "description": "Dengeli performans",
+            "recommended": False
+        },
+        {
+            "id": "gemini-1.5-flash",
+            "name": "Gemini 1.5 Flash",
+            "description": "Hızlı işlem",
+            "recommended": False
+        }
+    ]
+}
+_AI_MODELS_BODY = json_body(AI_MODELS)
+_AI_MODELS_ETAG = compute_etag(_AI_MODELS_BODY)
+
 @router.get("/ai-models")
-async def get_available_ai_models():
+async def get_available_ai_models(request: Request) -> Response:
     """Get list of available AI models"""
-    return {
-        "models": [
-            {
-                "id": "gemini-2.0-flash-exp",
-                "name": "Gemini 2.0 Flash (Experimental)",
-                "description": "En hızlı ve gelişmiş model",
-                "recommended": True
-            },
-            {
-                "id": "gemini-1.5-pro",
-                "name": "Gemini 1.5 Pro",
-                "description": "Dengeli performans",
-                "recommended": False
-            },
-            {
-                "id": "gemini-1.5-flash",
-                "name": "Gemini 1.5 Flash",
-                "description": "Hızlı işlem",
-                "recommended": False
-            }
-        ]
-    }
+    return conditional_response(
+        request,
+        _AI_MODELS_BODY,
+        etag=_AI_MODELS_ETAG,
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
 
 @router.put("/api-key")
 async def update_api_key(api_key_data: Dict[str, str]) -> Dict[str, Any]:
@@ -108,17 +153,13 @@ async def update_api_key(api_key_data: Dict[str, str]) -> Dict[str, Any]:
         api_key = api_key_data.get("api_key", "")
         
         # Read current settings
-        current_settings = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                current_settings = json.load(f)
+        current_settings = await _load_settings() or {}
         
         # Update API key
         current_settings["gemini_api_key"] = api_key
         
         # Save to file
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(current_settings, f, indent=2, ensure_ascii=False)
+        await _save_settings(current_settings)
         
         # Also update environment variable
         os.environ["GEMINI_API_KEY"] = api_key
@@ -136,10 +177,7 @@ async def update_api_key(api_key_data: Dict[str, str]) -> Dict[str, Any]:
 async def get_api_key_status() -> Dict[str, Any]:
     """Get API key configuration status"""
     try:
-        settings_data = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
+        settings_data = await _load_settings() or {}
         
         api_key = settings_data.get("gemini_api_key", "")
         
@@ -158,17 +196,13 @@ async def update_ai_prompt(prompt_data: Dict[str, str]) -> Dict[str, Any]:
         prompt = prompt_data.get("prompt", "")
         
         # Read current settings
-        current_settings = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                current_settings = json.load(f)
+        current_settings = await _load_settings() or {}
         
         # Update prompt
         current_settings["ai_prompt"] = prompt
         
         # Save to file
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(current_settings, f, indent=2, ensure_ascii=False)
+        await _save_settings(current_settings)
         
         return {
             "success": True,
@@ -180,19 +214,14 @@ async def update_ai_prompt(prompt_data: Dict[str, str]) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Prompt güncelleme hatası: {str(e)}")
 
 @router.get("/prompt")
-async def get_ai_prompt() -> Dict[str, Any]:
+async def get_ai_prompt(request: Request) -> Response:
     """Get current AI prompt"""
     try:
-        settings_data = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
+        settings_data = await _load_settings() or {}
         
         prompt = settings_data.get("ai_prompt", "Content konusunu analiz et ve çekici bir post oluştur.")
         
-        return {
-            "prompt": prompt
-        }
+        return conditional_response(request, json_body({"prompt": prompt}))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prompt okuma hatası: {str(e)}")
@@ -206,10 +235,7 @@ async def update_scrape_schedule(schedule_data: Dict[str, Any]) -> Dict[str, Any
         enabled = schedule_data.get("enabled", True)
         
         # Read current settings
-        current_settings = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                current_settings = json.load(f)
+        current_settings = await _load_settings() or {}
         
         # Update schedule
         current_settings["scrape_schedule_hour"] = hour
@@ -217,8 +243,7 @@ async def update_scrape_schedule(schedule_data: Dict[str, Any]) -> Dict[str, Any
         current_settings["auto_scrape_enabled"] = enabled
         
         # Save to file
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(current_settings, f, indent=2, ensure_ascii=False)
+        await _save_settings(current_settings)
         
         return {
             "success": True,
@@ -237,10 +262,7 @@ async def update_scrape_schedule(schedule_data: Dict[str, Any]) -> Dict[str, Any
 async def get_scrape_schedule() -> Dict[str, Any]:
     """Get current scraping schedule"""
     try:
-        settings_data = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
+        settings_data = await _load_settings() or {}
         
         return {
             "hour": settings_data.get("scrape_schedule_hour", 7),
@@ -3,30 +3,61 @@ Sources API Endpoints
 CRUD operations for content sources
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Body
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Body, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+import html
 import logging
-import requests
-from bs4 import BeautifulSoup
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy import select
+import re
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+from pydantic import BaseModel, HttpUrl, TypeAdapter
+from sqlalchemy import select, delete, tuple_
 
-from app.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
+from app.database import get_db, dialect_insert
 from app.models import Source, SourceResponse
 from app.services.scraper_service import scraper_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Kaynak analizi için paylaşılan HTTP istemcisi (bağlantı havuzu + HTTP/2)
+_http = httpx.AsyncClient(
+    http2=True,
+    timeout=10,
+    follow_redirects=True,
+    headers={'User-Agent': USER_AGENT},
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)."""
+    await _http.aclose()
+
+# <title> genelde <head> içinde ilk birkaç KB'da bulunur; tüm DOM'u parse etmeye gerek yok
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_TITLE_SCAN_CHARS = 8192
+_TITLE_STRAINER = SoupStrainer('title')
+
+def _extract_title(page_html: str) -> Optional[str]:
+    """Return the page <title> text, scanning only the head of the document when possible."""
+    match = _TITLE_RE.search(page_html, 0, _TITLE_SCAN_CHARS)
+    if match:
+        title = html.unescape(" ".join(match.group(1).split()))
+    else:
+        # Fallback: title beyond the first chunk (e.g. script-heavy heads)
+        title_tag = BeautifulSoup(page_html, 'lxml', parse_only=_TITLE_STRAINER).find('title')
+        title = title_tag.get_text(strip=True) if title_tag else None
+    return title or None
+
 class CreateSourceURL(BaseModel):
     url: HttpUrl
 
 async def analyze_and_fetch_source_details(url: str) -> dict:
     """Analyzes a URL to determine its platform and fetches its title with intelligent feed discovery."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
     try:
         platform = "website"
         source_type = "rss"
@@ -45,21 +76,24 @@ async def analyze_and_fetch_source_details(url: str) -> dict:
             else:
                 source_type = "channel"
             
+            # Fetch the page once: it gives both the title and (usually) the channel ID
+            page_html = None
+            try:
+                response = await _http.get(url)
+                response.raise_for_status()
+                page_html = response.text
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to fetch YouTube page {url}: {e}")
+            
             # Try to get RSS URL using scraper service
-            rss_url = scraper_service._get_youtube_rss_url(url)
+            rss_url = scraper_service._get_youtube_rss_url(url, html=page_html)
             if rss_url:
                 final_url = rss_url
-                # Get title from the original URL
-                try:
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    title_tag = soup.find('title')
-                    if title_tag:
-                        title = title_tag.get_text(strip=True)
-                        # Clean YouTube title
-                        title = title.replace(' - YouTube', '').strip()
-                except:
+                page_title = _extract_title(page_html) if page_html else None
+                if page_title:
+                    # Clean YouTube title
+                    title = page_title.replace(' - YouTube', '').strip()
+                else:
                     title = f"YouTube Channel/Playlist"
             else:
                 title = f"YouTube: {url.split('/')[-1]}"
@@ -88,16 +122,14 @@ async def analyze_and_fetch_source_details(url: str) -> dict:
         else:
             # First get the page title
             try:
-                response = requests.get(url, headers=headers, timeout=10)
+                response = await _http.get(url)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                title_tag = soup.find('title')
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
+                page_title = _extract_title(response.text)
+                if page_title:
+                    title = page_title
                 
-                # Try automatic feed discovery
-                feed_discovery = await scraper_service.discover_feeds(url)
+                # Try automatic feed discovery (reuse the page we just downloaded)
+                feed_discovery = await scraper_service.discover_feeds(url, page_content=response.content)
                 if feed_discovery['success'] and feed_discovery['feeds']:
                     # Use the best feed found
                     best_feed = feed_discovery['feeds'][0]  # Highest scored feed
@@ -123,7 +155,7 @@ async def analyze_and_fetch_source_details(url: str) -> dict:
             "url": final_url  # May be different from input URL (e.g., RSS feed URL)
         }
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching URL {url}: {e}")
         raise HTTPException(status_code=400, detail=f"URL alınamadı veya geçersiz: {e}")
 
@@ -137,24 +169,28 @@ async def create_source(source_data: CreateSourceURL):
             details = await analyze_and_fetch_source_details(original_url)
             final_url = details["url"]  # This might be different (e.g., RSS feed URL)
             
-            # Check if source with this final URL already exists
-            result = await db.execute(select(Source).where(Source.url == final_url))
-            existing_source = result.scalar_one_or_none()
-            if existing_source:
+            # Insert in one statement; the UNIQUE(url) constraint resolves duplicates
+            # atomically instead of a racy SELECT-then-INSERT
+            stmt = (
+                dialect_insert(Source)
+                .values(
+                    url=final_url,  # Use the optimized URL (e.g., RSS feed instead of website)
+                    name=details["name"],
+                    platform=details["platform"],
+                    source_type=details["source_type"]
+                )
+                .on_conflict_do_nothing(index_elements=[Source.url])
+                .returning(Source)
+            )
+            new_source = (await db.execute(stmt)).scalar_one_or_none()
+            if new_source is None:
+                existing_name = await db.scalar(select(Source.name).where(Source.url == final_url))
                 raise HTTPException(
                     status_code=409, 
-                    detail=f"Bu URL ile bir kaynak zaten mevcut: '{existing_source.name}'"
+                    detail=f"Bu URL ile bir kaynak zaten mevcut: '{existing_name}'"
                 )
 
-            new_source = Source(
-                url=final_url,  # Use the optimized URL (e.g., RSS feed instead of website)
-                name=details["name"],
-                platform=details["platform"],
-                source_type=details["source_type"]
-            )
-            db.add(new_source)
             await db.commit()
-            await db.refresh(new_source)
             return new_source
         except HTTPException as e:
             raise e # Re-raise client-side errors
@@ -163,21 +199,43 @@ async def create_source(source_data: CreateSourceURL):
             await db.rollback()
             raise HTTPException(status_code=500, detail="Kaynak oluşturulurken beklenmedik bir sunucu hatası oluştu.")
 
+# Liste uç noktası sadece response modelinin ihtiyaç duyduğu kolonları çeker
+_LIST_COLUMNS = [getattr(Source, name) for name in SourceResponse.model_fields]
+_LIST_ADAPTER = TypeAdapter(List[SourceResponse])
+
 @router.get("/", response_model=List[SourceResponse])
-async def get_sources():
+async def get_sources(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page")
+):
+    """List sources, newest first (keyset paginated by created_at, id)"""
     async with get_db() as db:
-        result = await db.execute(select(Source).order_by(Source.created_at.desc()))
-        sources = result.scalars().all()
-        return sources
+        query = select(*_LIST_COLUMNS)
+        if cursor:
+            # Aynı created_at'e sahip satırlar id ile ayrışır; sayfa sınırında atlanmaz/tekrarlanmaz
+            last_created_at, last_id = decode_cursor(cursor)
+            query = query.where(tuple_(Source.created_at, Source.id) < tuple_(last_created_at, last_id))
+        query = query.order_by(Source.created_at.desc(), Source.id.desc()).limit(limit + 1)
+        
+        result = await db.execute(query)
+        rows = result.mappings().all()
+    
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {"X-Next-Cursor": encode_cursor(rows[-1]["created_at"], rows[-1]["id"])}
+    
+    # Satırlar zaten DB şemasına uygun; tekrar doğrulamadan doğrudan JSON'a serialize et
+    sources = [SourceResponse.model_construct(**row) for row in rows]
+    return Response(content=_LIST_ADAPTER.dump_json(sources), media_type="application/json", headers=headers)
 
 @router.delete("/{source_id}", status_code=204)
 async def delete_source(source_id: str):
     async with get_db() as db:
-        result = await db.execute(select(Source).where(Source.id == source_id))
-        source = result.scalar_one_or_none()
-        if not source:
+        # Tek DELETE; satırı önce yükleyip ORM üzerinden silmeye gerek yok (Source'un ilişkisi yok)
+        result = await db.execute(delete(Source).where(Source.id == source_id))
+        if not result.rowcount:
             raise HTTPException(status_code=404, detail="Kaynak bulunamadı")
         
-        await db.delete(source)
         await db.commit()
         return None 
\ No newline at end of file
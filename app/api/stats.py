@@ -3,62 +3,110 @@ Statistics API Endpoints
 System statistics and metrics
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
-from app.database import get_db
-from app.models import Topic, Source, AIContent, StatsResponse
+from app.core.etag import compute_etag, conditional_response, etag_matches, json_body
+from app.database import get_db, TOPIC_COUNTERS_ENABLED, TOPIC_VERSION_KEY
+from app.models import Topic, TopicCounter, Source, AIContent, StatsResponse
 from app.services.scheduler_service import get_current_scraping_status
 
 router = APIRouter()
 
+def _stats_validator(today_start: datetime):
+    """Cheap single-row SELECT whose values change whenever any reported stat can change.
+
+    topics: the trigger-maintained write version plus the oldest row still inside the 24h window
+    (it moves exactly when a topic ages out of today's count); sources/AI: row counts plus the
+    latest scrape / completion time.
+    """
+    return select(
+        select(TopicCounter.value).where(TopicCounter.key == TOPIC_VERSION_KEY).scalar_subquery(),
+        select(func.min(Topic.extracted_at)).where(Topic.extracted_at >= today_start).scalar_subquery(),
+        select(func.count()).select_from(Source).scalar_subquery(),
+        select(func.max(Source.last_scraped_at)).scalar_subquery(),
+        select(func.count()).select_from(AIContent).scalar_subquery(),
+        select(func.max(AIContent.completed_at)).scalar_subquery(),
+    )
+
 @router.get("/", response_model=StatsResponse)
-async def get_stats():
-    """Get system statistics"""
+async def get_stats(request: Request):
+    """Get system statistics (ETag'li: değişmeyen istatistikler için 304 döner)"""
     async with get_db() as db:
-        # Topic stats
-        total_topics = await db.scalar(select(func.count()).select_from(Topic))
-        pending_topics = await db.scalar(select(func.count()).select_from(Topic).where(Topic.status == "pending"))
-        liked_topics = await db.scalar(select(func.count()).select_from(Topic).where(Topic.status == "liked"))
-        disliked_topics = await db.scalar(select(func.count()).select_from(Topic).where(Topic.status == "disliked"))
+        now = datetime.now(timezone.utc)
+        today_start = now - timedelta(days=1)  # Today's topics (last 24 hours)
+        # Get actual scraping status from scheduler service
+        scraping_status_data = get_current_scraping_status()
         
-        # Today's topics (last 24 hours)
-        today_start = datetime.utcnow() - timedelta(days=1)
-        today_topics = await db.scalar(
-            select(func.count()).select_from(Topic).where(Topic.extracted_at >= today_start)
-        )
+        etag = None
+        if TOPIC_COUNTERS_ENABLED:
+            # Önce ucuz doğrulayıcı: istemcinin kopyası güncelse ağır sayımlar hiç çalışmaz
+            validator = (await db.execute(_stats_validator(today_start))).one()
+            etag = compute_etag(json_body([list(validator), scraping_status_data]))
+            if etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            
+            # Topic stats - trigger'larla güncel tutulan sayaçlar: tabloyu taramadan O(1)
+            counters = dict((await db.execute(select(TopicCounter.key, TopicCounter.value))).all())
+            today = await db.scalar(
+                select(func.count()).select_from(Topic).where(Topic.extracted_at >= today_start)
+            )
+            topic_counts = SimpleNamespace(
+                total=counters.get("total"),
+                pending=counters.get("pending"),
+                liked=counters.get("liked"),
+                disliked=counters.get("disliked"),
+                today=today,
+            )
+        else:
+            # Tek sorguda gruplanmış sayımlar
+            topic_counts = (await db.execute(
+                select(
+                    func.count().label("total"),
+                    func.count().filter(Topic.status == "pending").label("pending"),
+                    func.count().filter(Topic.status == "liked").label("liked"),
+                    func.count().filter(Topic.status == "disliked").label("disliked"),
+                    func.count().filter(Topic.extracted_at >= today_start).label("today"),
+                ).select_from(Topic)
+            )).one()
         
-        # Source stats
-        total_sources = await db.scalar(select(func.count()).select_from(Source))
-        active_sources = await db.scalar(select(func.count()).select_from(Source).where(Source.is_active == True))
+        # Source stats + latest scrape time (MAX aggregate, no ORM row to hydrate)
+        source_counts = (await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(Source.is_active == True).label("active"),
+                func.max(Source.last_scraped_at).label("last_scraped_at"),
+            ).select_from(Source)
+        )).one()
         
         # AI content stats
-        total_ai_contents = await db.scalar(select(func.count()).select_from(AIContent))
-        completed_ai_contents = await db.scalar(select(func.count()).select_from(AIContent).where(AIContent.status == "completed"))
+        ai_counts = (await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(AIContent.status == "completed").label("completed"),
+            ).select_from(AIContent)
+        )).one()
         
-        # Latest scrape time
-        latest_source = await db.scalar(
-            select(Source).where(Source.last_scraped_at.isnot(None)).order_by(Source.last_scraped_at.desc()).limit(1)
-        )
-        last_scrape_time = latest_source.last_scraped_at if latest_source else None
-        
-        # Get actual scraping status from scheduler service
-        scraping_status_data = get_current_scraping_status()
-        
-        return StatsResponse(
-            total_topics=total_topics or 0,
-            pending_topics=pending_topics or 0,
-            liked_topics=liked_topics or 0,
-            disliked_topics=disliked_topics or 0,
-            today_topics=today_topics or 0,
-            total_sources=total_sources or 0,
-            active_sources=active_sources or 0,
-            sources_count=total_sources or 0,  # Alias for compatibility
-            total_ai_contents=total_ai_contents or 0,
-            completed_ai_contents=completed_ai_contents or 0,
-            last_scrape_time=scraping_status_data.get('last_scrape_time') or last_scrape_time,
+        stats = StatsResponse(
+            total_topics=topic_counts.total or 0,
+            pending_topics=topic_counts.pending or 0,
+            liked_topics=topic_counts.liked or 0,
+            disliked_topics=topic_counts.disliked or 0,
+            today_topics=topic_counts.today or 0,
+            total_sources=source_counts.total or 0,
+            active_sources=source_counts.active or 0,
+            sources_count=source_counts.total or 0,  # Alias for compatibility
+            total_ai_contents=ai_counts.total or 0,
+            completed_ai_contents=ai_counts.completed or 0,
+            last_scrape_time=scraping_status_data.get('last_scrape_time') or source_counts.last_scraped_at,
             next_scrape_time=scraping_status_data.get('next_scrape_time'),
-            last_update=datetime.utcnow(),
+            last_update=now,
             scraping_status=scraping_status_data.get('status', 'idle')
-        ) 
\ No newline at end of file
+        )
+    
+    if etag is None:
+        # Sayaç tetikleyicisi olmayan backend'ler: last_update her çağrıda değişir; ETag gerçek istatistiklerden türetilir
+        etag = compute_etag(stats.model_dump_json(exclude={"last_update"}).encode())
+    return conditional_response(request, stats.model_dump_json().encode(), etag=etag) 
\ No newline at end of file
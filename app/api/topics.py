@@ -3,143 +3,180 @@ Topics API Endpoints
 CRUD operations and swipe functionality for topics
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from datetime import datetime
-from sqlalchemy import select, func
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from sqlalchemy import select, func, update, tuple_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 
-from app.database import get_db
-from app.models import Topic, TopicResponse, TopicUpdate, TopicCreate
+from app.core.cache import ResponseCache
+from app.core.pagination import encode_cursor, decode_cursor
+from app.database import get_db_dep, TOPIC_COUNTERS_ENABLED, TOPIC_VERSION_KEY
+from app.models import Topic, TopicCounter, TopicResponse, TopicUpdate, TopicCreate
 
 router = APIRouter()
 
+# Swipe ekranı ve dashboard aynı listeleri sık sık ister. Cache anahtarı topic_counters'taki
+# 'version' satırını içerir: kazıyıcı ya da başka bir worker yazdığında eski girişler kendiliğinden ıskalanır.
+# Sayaç tetikleyicileri olmayan backend'lerde versiyon yoktur; cache atlanır.
+LIST_CACHE_TTL = 30
+_list_cache = ResponseCache(ttl=LIST_CACHE_TTL)
+_LIST_ADAPTER = TypeAdapter(List[TopicResponse])
+# Listeler ORM nesnesi yerine sadece response modelinin kolonlarını çeker
+_LIST_COLUMNS = [getattr(Topic, name) for name in TopicResponse.model_fields]
+
+# Modül seviyesinde bir kez kurulur; SQLAlchemy derlenmiş hâlini cache'ler
+_SELECT_TOPIC_BY_ID = select(Topic).where(Topic.id == bindparam("tid"))
+
+_SELECT_TOPIC_VERSION = select(TopicCounter.value).where(TopicCounter.key == TOPIC_VERSION_KEY)
+
+async def _list_version(db: AsyncSession) -> Optional[int]:
+    """Current topics write version, or None when the backend has no counter triggers."""
+    if not TOPIC_COUNTERS_ENABLED:
+        return None
+    return await db.scalar(_SELECT_TOPIC_VERSION) or 0
+
+def _list_body(rows) -> bytes:
+    # Satırlar zaten DB şemasına uygun; tekrar doğrulamadan doğrudan JSON'a serialize et
+    return _LIST_ADAPTER.dump_json([TopicResponse.model_construct(**row) for row in rows])
+
 @router.get("/", response_model=List[TopicResponse])
 async def get_topics(
     status: Optional[str] = Query(None, description="Filter by status: pending, liked, disliked"),
     platform: Optional[str] = Query(None, description="Filter by platform"),
     limit: int = Query(50, ge=1, le=500),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_db_dep)
 ):
-    """Get topics with optional filtering"""
-    async with get_db() as db:
-        query = select(Topic)
-        
-        if status:
-            query = query.where(Topic.status == status)
-        if platform:
-            query = query.where(Topic.platform == platform)
-        
-        query = query.order_by(Topic.extracted_at.desc())
-        query = query.offset(offset).limit(limit)
-        
-        result = await db.execute(query)
-        topics = result.scalars().all()
-        
-        return topics
+    """Get topics with optional filtering (keyset pagination, newest first)"""
+    version = await _list_version(db)
+    cache_key = ("list", version, status, platform, limit, cursor)
+    cached = _list_cache.get(cache_key) if version is not None else None
+    if cached is None:
+        cached = await _query_topics(db, status, platform, limit, cursor)
+        if version is not None:
+            _list_cache.set(cache_key, cached)
+    
+    body, next_cursor = cached
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _query_topics(db: AsyncSession, status, platform, limit: int, cursor: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    query = select(*_LIST_COLUMNS)
+    
+    if status:
+        query = query.where(Topic.status == status)
+    if platform:
+        query = query.where(Topic.platform == platform)
+    if cursor:
+        # OFFSET yerine (extracted_at, id) üzerinden devam: derin sayfalar da index aralığı taraması
+        last_extracted_at, last_id = decode_cursor(cursor)
+        query = query.where(tuple_(Topic.extracted_at, Topic.id) < tuple_(last_extracted_at, last_id))
+    
+    query = query.order_by(Topic.extracted_at.desc(), Topic.id.desc())
+    query = query.limit(limit + 1)
+    
+    result = await db.execute(query)
+    topics = result.mappings().all()
+    
+    next_cursor = None
+    if len(topics) > limit:
+        topics = topics[:limit]
+        next_cursor = encode_cursor(topics[-1]['extracted_at'], topics[-1]['id'])
+    
+    return _list_body(topics), next_cursor
 
 @router.get("/pending", response_model=List[TopicResponse])
-async def get_pending_topics(limit: int = Query(10, ge=1, le=100)):
+async def get_pending_topics(limit: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_db_dep)):
     """Get pending topics for swipe interface"""
-    async with get_db() as db:
-        query = select(Topic).where(Topic.status == "pending")
-        query = query.order_by(Topic.extracted_at.desc()).limit(limit)
+    version = await _list_version(db)
+    cache_key = ("pending", version, limit)
+    body = _list_cache.get(cache_key) if version is not None else None
+    if body is None:
+        query = select(*_LIST_COLUMNS).where(Topic.status == "pending")
+        query = query.order_by(Topic.extracted_at.desc(), Topic.id.desc()).limit(limit)
         
         result = await db.execute(query)
-        topics = result.scalars().all()
-        
-        return topics
+        body = _list_body(result.mappings())
+        if version is not None:
+            _list_cache.set(cache_key, body)
+    
+    return Response(content=body, media_type="application/json")
+
+async def _set_topic_status(db: AsyncSession, topic_id: str, **values) -> None:
+    """Apply a swipe state change in a single UPDATE; 404 if the topic does not exist."""
+    result = await db.execute(update(Topic).where(Topic.id == topic_id).values(**values))
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    await db.commit()
+    _list_cache.invalidate()
+
+@router.post("/bulk/like")
+async def bulk_like_topics(
+    ids: List[str] = Body(..., embed=True, min_length=1, max_length=500),
+    db: AsyncSession = Depends(get_db_dep)
+):
+    """Like several topics at once with a single UPDATE ... WHERE id IN (...)"""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(Topic)
+        .where(Topic.id.in_(ids))
+        .values(status="liked", liked_at=now, disliked_at=None)
+    )
+    await db.commit()
+    _list_cache.invalidate()
+    return {"success": True, "updated": result.rowcount}
 
 @router.post("/{topic_id}/like")
-async def like_topic(topic_id: str):
+async def like_topic(topic_id: str, db: AsyncSession = Depends(get_db_dep)):
     """Like a topic (swipe right)"""
-    async with get_db() as db:
-        result = await db.execute(select(Topic).where(Topic.id == topic_id))
-        topic = result.scalar_one_or_none()
-        
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        topic.status = "liked"
-        topic.liked_at = datetime.utcnow()
-        if topic.disliked_at:
-            topic.disliked_at = None
-        
-        db.add(topic)
-        await db.commit()
-        
-        return {"success": True, "message": "Topic liked"}
+    await _set_topic_status(db, topic_id, status="liked", liked_at=datetime.now(timezone.utc), disliked_at=None)
+    return {"success": True, "message": "Topic liked"}
 
 @router.post("/{topic_id}/dislike") 
-async def dislike_topic(topic_id: str):
+async def dislike_topic(topic_id: str, db: AsyncSession = Depends(get_db_dep)):
     """Dislike a topic (swipe left)"""
-    async with get_db() as db:
-        result = await db.execute(select(Topic).where(Topic.id == topic_id))
-        topic = result.scalar_one_or_none()
-        
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        topic.status = "disliked"
-        topic.disliked_at = datetime.utcnow()
-        if topic.liked_at:
-            topic.liked_at = None
-        
-        db.add(topic)
-        await db.commit()
-        
-        return {"success": True, "message": "Topic disliked"}
+    await _set_topic_status(db, topic_id, status="disliked", disliked_at=datetime.now(timezone.utc), liked_at=None)
+    return {"success": True, "message": "Topic disliked"}
 
 @router.post("/{topic_id}/reset")
-async def reset_topic(topic_id: str):
+async def reset_topic(topic_id: str, db: AsyncSession = Depends(get_db_dep)):
     """Reset topic status to pending"""
-    async with get_db() as db:
-        result = await db.execute(select(Topic).where(Topic.id == topic_id))
-        topic = result.scalar_one_or_none()
-        
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        topic.status = "pending"
-        topic.liked_at = None
-        topic.disliked_at = None
-        
-        db.add(topic)
-        await db.commit()
-        
-        return {"success": True, "message": "Topic reset to pending"}
+    await _set_topic_status(db, topic_id, status="pending", liked_at=None, disliked_at=None)
+    return {"success": True, "message": "Topic reset to pending"}
 
 @router.get("/{topic_id}", response_model=TopicResponse)
-async def get_topic(topic_id: str):
+async def get_topic(topic_id: str, db: AsyncSession = Depends(get_db_dep)):
     """Get single topic by ID"""
-    async with get_db() as db:
-        result = await db.execute(select(Topic).where(Topic.id == topic_id))
-        topic = result.scalar_one_or_none()
-        
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        
-        return topic
+    result = await db.execute(_SELECT_TOPIC_BY_ID, {"tid": topic_id})
+    topic = result.scalar_one_or_none()
+    
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    
+    return topic
 
 @router.post("/", response_model=TopicResponse)
-async def create_manual_topic(topic_data: TopicCreate):
+async def create_manual_topic(topic_data: TopicCreate, db: AsyncSession = Depends(get_db_dep)):
     """Create manual topic (user-added idea)"""
-    async with get_db() as db:
-        # Create new topic
-        topic = Topic(
-            title=topic_data.title,
-            description=topic_data.description,
-            content=topic_data.content,
-            platform=topic_data.platform,
-            source=topic_data.source,
-            link=topic_data.link,
-            publish_date=topic_data.publish_date,
-            popularity_score=topic_data.popularity_score,
-            content_length=len(topic_data.content or ""),
-            status="liked"  # Manual topics are automatically liked
-        )
-        
-        db.add(topic)
-        await db.commit()
-        await db.refresh(topic)
-        
-        return topic 
\ No newline at end of file
+    # Create new topic
+    topic = Topic(
+        title=topic_data.title,
+        description=topic_data.description,
+        content=topic_data.content,
+        platform=topic_data.platform,
+        source=topic_data.source,
+        link=topic_data.link,
+        publish_date=topic_data.publish_date,
+        popularity_score=topic_data.popularity_score,
+        content_length=len(topic_data.content or ""),
+        status="liked"  # Manual topics are automatically liked
+    )
+    
+    db.add(topic)
+    await db.commit()
+    _list_cache.invalidate()
+    await db.refresh(topic)
+    
+    return topic 
\ No newline at end of file
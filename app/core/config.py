@@ -6,6 +6,7 @@ Environment-based configuration with Pydantic
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from typing import List, Optional
+from functools import lru_cache
 import os
 from pathlib import Path
 
@@ -22,12 +23,17 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite+aiosqlite:///./data/content_manager.db"
     db_echo: bool = Field(default=False, description="Log SQL queries - only for development")
+    db_pool_size: int = Field(default=20, description="Persistent connections kept in the pool")
+    db_max_overflow: int = Field(default=40, description="Extra connections allowed under burst load")
+    db_pool_recycle: int = Field(default=3600, description="Recycle connections older than this (seconds)")
+    db_pool_timeout: int = Field(default=30, description="Seconds to wait for a free connection")
 
     # AI
     gemini_api_key: str = Field("", alias="GEMINI_API_KEY")
     default_ai_model: str = "gemini-2.0-flash-exp"
     ai_temperature: float = 0.7
     ai_max_tokens: int = 2000
+    ai_concurrency: int = Field(default=4, description="Max concurrent Gemini requests (provider rate limits)")
     
     # Production settings
     production_mode: bool = Field(default=False, alias="PRODUCTION")
@@ -66,7 +72,7 @@ class Settings(BaseSettings):
     scrape_schedule_hour: int = 7  # 07:00 AM
     scrape_schedule_minute: int = 0
 
-    def __post_init__(self):
+    def model_post_init(self, __context) -> None:
         """Post-initialization to adjust settings for production"""
         if self.production_mode:
             self.debug = False
@@ -82,15 +88,13 @@ class Settings(BaseSettings):
         extra='ignore'  # Ignore undefined env vars instead of raising ValidationError
     )
 
-# Global settings instance
-_settings = None
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get singleton settings instance"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    """Get singleton settings instance (.env is parsed once)"""
+    return Settings()
+
+# Global settings instance - hot paths can import this directly
+settings = get_settings()
 
 # Environment helper
 def is_development() -> bool:
@@ -111,6 +115,5 @@ def get_database_path() -> str:
 
 def ensure_data_directory():
     """Veri (data) klasörünün var olduğundan emin olur."""
-    data_dir = Path("data")
-    if not data_dir.exists():
-        data_dir.mkdir() 
\ No newline at end of file
+    # Tek syscall; varsayılan SQLite URL'si gibi çalışma dizinine göre ("./data")
+    Path("data").mkdir(parents=True, exist_ok=True) 
\ No newline at end of file
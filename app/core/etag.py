@@ -0,0 +1,48 @@
+"""
+ETag helpers for rarely changing, frequently polled endpoints
+Conditional GET support (If-None-Match -> 304 Not Modified)
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+JSON_MEDIA_TYPE = "application/json"
+
+def json_body(payload: Any) -> bytes:
+    """Encode a payload exactly like FastAPI's JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def compute_etag(data: bytes) -> str:
+    """Strong ETag (quoted) derived from the given bytes."""
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Return 304 when the client already has this representation, else the JSON body."""
+    etag = etag or compute_etag(body)
+    response_headers = {"ETag": etag, **(headers or {})}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=response_headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=response_headers)
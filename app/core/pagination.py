@@ -0,0 +1,22 @@
+"""
+Keyset pagination helpers
+Opaque cursors over (timestamp, id) so rows sharing a timestamp are neither skipped nor repeated
+"""
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """Opaque keyset cursor pointing at the last row of a page."""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        iso_ts, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(iso_ts), last_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -5,16 +5,160 @@ SQLAlchemy with async support
 
 import logging
 from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from app.core.config import get_settings
 from app.models import Base
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-engine = create_async_engine(settings.database_url, echo=settings.db_echo)
-AsyncSessionFactory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+def _engine_options(database_url: str) -> dict:
+    """Pool options for the configured backend."""
+    if database_url.startswith("sqlite") and (":memory:" in database_url or database_url.endswith("://")):
+        # In-memory SQLite: tek bağlantı paylaşılmalı, yoksa her bağlantı boş bir DB görür
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if database_url.startswith("sqlite"):
+        # aiosqlite varsayılan olarak NullPool kullanır (her istekte yeni bağlantı); havuzu açıkça seç
+        options["poolclass"] = AsyncAdaptedQueuePool
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        # Ağ üzerinden bağlanan sunucularda kopmuş bağlantıları checkout sırasında yakala
+        options["pool_pre_ping"] = True
+    return options
+
+engine = create_async_engine(settings.database_url, echo=settings.db_echo, **_engine_options(settings.database_url))
+AsyncSessionFactory = async_sessionmaker(engine, expire_on_commit=False)
+
+if settings.database_url.startswith("sqlite"):
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        """WAL: okuyucular yazarı beklemez; NORMAL senkronizasyon WAL ile güvenli ve çok daha az fsync yapar."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+def dialect_insert(table):
+    """INSERT construct of the configured backend; supports on_conflict_do_nothing (SQLite, PostgreSQL)."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported for the '{dialect}' backend")
+
+# topics tablosundaki her yazma, sayaçları aynı transaction içinde günceller; /stats COUNT(*) yapmaz
+TOPIC_COUNTERS_ENABLED = settings.database_url.startswith("sqlite")
+TOPIC_VERSION_KEY = "version"
+
+_TOPIC_COUNTER_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_topic_counters_insert AFTER INSERT ON topics BEGIN
+        INSERT INTO topic_counters (key, value) VALUES ('total', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1;
+        INSERT INTO topic_counters (key, value) VALUES (COALESCE(NEW.status, 'pending'), 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_topic_counters_update AFTER UPDATE OF status ON topics
+    WHEN OLD.status IS NOT NEW.status BEGIN
+        UPDATE topic_counters SET value = value - 1 WHERE key = COALESCE(OLD.status, 'pending');
+        INSERT INTO topic_counters (key, value) VALUES (COALESCE(NEW.status, 'pending'), 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_topic_counters_delete AFTER DELETE ON topics BEGIN
+        UPDATE topic_counters SET value = value - 1 WHERE key IN ('total', COALESCE(OLD.status, 'pending'));
+    END
+    """,
+] + [
+    # 'version' topics tablosundaki her yazmada artar; worker'lar arası liste cache'i buna göre anahtarlanır
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_topic_version_{event.lower()} AFTER {event} ON topics BEGIN
+        INSERT INTO topic_counters (key, value) VALUES ('{TOPIC_VERSION_KEY}', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1;
+    END
+    """
+    for event in ("INSERT", "UPDATE", "DELETE")
+]
+
+async def _init_topic_counters(conn) -> None:
+    """Install the counter triggers and rebuild the counts from the topics table."""
+    for ddl in _TOPIC_COUNTER_TRIGGERS:
+        await conn.execute(text(ddl))
+    # Sayım tetikleyicilerle aynı transaction'da yeniden kurulur; mevcut veriyle her zaman tutarlı başlar
+    # 'version' korunur: yeniden başlatmada sıfırlanırsa eski cache anahtarlarıyla çakışabilir
+    await conn.execute(text(f"DELETE FROM topic_counters WHERE key != '{TOPIC_VERSION_KEY}'"))
+    await conn.execute(text(
+        "INSERT INTO topic_counters (key, value) "
+        "SELECT 'total', COUNT(*) FROM topics "
+        "UNION ALL SELECT COALESCE(status, 'pending'), COUNT(*) FROM topics GROUP BY COALESCE(status, 'pending')"
+    ))
+
+def _add_missing_columns(sync_conn) -> None:
+    """create_all mevcut tablolara yeni kolon eklemez; nullable yeni kolonları ALTER TABLE ile ekle."""
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            logger.info(f"➕ Added column {table.name}.{column.name}")
+
+# Eski kazıyıcı dedup özetini description kolonunda tutuyordu; content_hash'e taşı (tekrarlayanları sadece temizle)
+_LEGACY_HASH_MIGRATION = [
+    """
+    UPDATE topics SET content_hash = description, description = NULL
+    WHERE id IN (
+        SELECT MIN(id) FROM topics
+        WHERE content_hash IS NULL AND length(description) = 32 AND description NOT GLOB '*[^0-9a-f]*'
+          AND description NOT IN (SELECT content_hash FROM topics WHERE content_hash IS NOT NULL)
+        GROUP BY description
+    )
+    """,
+    """
+    UPDATE topics SET description = NULL
+    WHERE content_hash IS NULL AND length(description) = 32 AND description NOT GLOB '*[^0-9a-f]*'
+    """,
+]
+
+async def _migrate_legacy_hashes(conn) -> None:
+    for statement in _LEGACY_HASH_MIGRATION:
+        await conn.execute(text(statement))
+
+# Bileşik index'lerin baş kolonlarını tekrarlayan eski index'ler: her insert/swipe'ta boşuna güncellenir
+_OBSOLETE_INDEXES = ("ix_topics_extracted_at", "ix_topics_status", "ix_topics_status_extracted")
+
+async def _drop_obsolete_indexes(conn) -> None:
+    for name in _OBSOLETE_INDEXES:
+        await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def _create_missing_indexes(sync_conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 async def init_database():
     """Veritabanını ve tabloları oluşturur."""
@@ -22,33 +166,32 @@ async def init_database():
         try:
             # await conn.run_sync(Base.metadata.drop_all) # Geliştirme için gerekirse
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns)
+            if settings.database_url.startswith("sqlite"):
+                await _migrate_legacy_hashes(conn)
+            # create_all mevcut tablolara sonradan eklenen index'leri kurmaz; eksik olanları tamamla
+            await conn.run_sync(_create_missing_indexes)
+            await _drop_obsolete_indexes(conn)
+            if TOPIC_COUNTERS_ENABLED:
+                await _init_topic_counters(conn)
             logger.info(f"✅ Async database initialized and tables created: {settings.database_url}")
         except Exception as e:
             logger.error(f"❌ Database initialization failed: {e}")
             raise
 
 @asynccontextmanager
-async def get_db_session() -> AsyncSession:
-    """Dependency for getting a database session."""
-    session = AsyncSessionFactory()
-    try:
-        yield session
-        await session.commit()
-    except Exception as e:
-        await session.rollback()
-        logger.error(f"DB Session error: {e}")
-        raise
-    finally:
-        await session.close()
-
-@asynccontextmanager
-async def get_db() -> AsyncSession:
-    """Async context manager for DB session (compatible with 'async with')."""
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Async context manager for DB session (compatible with 'async with'); commits on success."""
     async with AsyncSessionFactory() as session:
         try:
             yield session
-            await session.commit()
         except Exception as e:
-            await session.rollback()
+            # Oturum kapanırken açık transaction zaten geri alınır
             logger.error(f"DB Session error: {e}")
-            raise 
\ No newline at end of file
+            raise
+        await session.commit()
+
+async def get_db_dep() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session per request, no implicit commit (writers commit explicitly)."""
+    async with AsyncSessionFactory() as session:
+        yield session
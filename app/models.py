@@ -3,17 +3,49 @@ Database models for Content Manager API v2.0.0
 SQLAlchemy ORM models with modern typing
 """
 
+import os
+import time
 import uuid
 from sqlalchemy import (
-    Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, Enum as PgEnum
+    Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, Index, Enum as PgEnum
 )
 from sqlalchemy.orm import relationship, declarative_base
-from datetime import datetime
+from sqlalchemy.types import TypeDecorator
+from datetime import datetime, timezone
 from typing import Optional
 import enum
 
 Base = declarative_base()
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class UTCDateTime(TypeDecorator):
+    """Timestamp that is always written as UTC and read back timezone-aware.
+
+    SQLite has no timezone storage and returns naive values even for DateTime(timezone=True);
+    naive inputs are taken to be UTC (legacy rows were written with utcnow()).
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None:
+            value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+def new_id() -> str:
+    """UUIDv7 string: 48-bit millisecond timestamp prefix keeps new primary keys at the end of the index."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)    # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)    # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
 class Status(str, enum.Enum):
     PENDING = "pending"
     LIKED = "liked"
@@ -43,7 +75,7 @@ class Source(Base):
     """Content source model - Kazıma kaynakları"""
     __tablename__ = "sources"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     
     # Source info
     name = Column(String(255), nullable=False)
@@ -56,13 +88,28 @@ class Source(Base):
     scrape_frequency = Column(String(20), default="daily")  # daily, weekly, manual
     
     # Dates
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_scraped_at = Column(DateTime, nullable=True)
+    created_at = Column(UTCDateTime, default=_utcnow)
+    last_scraped_at = Column(UTCDateTime, nullable=True)
+    
+    # HTTP cache validators of the last feed response (conditional GET -> 304)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    # Content-Length of the last feed response; with Last-Modified it lets a HEAD request skip the GET
+    last_content_length = Column(Integer, nullable=True)
+    # Newest feed entry (guid or link) seen by the last scrape; the entry loop stops there
+    latest_entry_id = Column(String(1000), nullable=True)
+    # Resolved feed URL (e.g. YouTube channel/video URL -> videos.xml), resolved once and reused
+    rss_url = Column(String(1000), nullable=True)
     
     # Metrics
     total_content_count = Column(Integer, default=0)
     last_content_count = Column(Integer, default=0)
     
+    __table_args__ = (
+        # /sources keyset sayfalaması: ORDER BY created_at DESC, id DESC
+        Index("ix_sources_created_id", created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f"<Source(id='{self.id}', name='{self.name}', platform='{self.platform}')>"
 
@@ -70,40 +117,58 @@ class Topic(Base):
     """Content topic model - Kazınan içerikler"""
     __tablename__ = "topics"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     
     # Content info
     title = Column(String(500), nullable=False)
     description = Column(Text)
     content = Column(Text)
-    platform = Column(String(50), nullable=False)  # YouTube, Instagram, Twitter, Blog
+    platform = Column(String(50), nullable=False, index=True)  # YouTube, Instagram, Twitter, Blog
     source = Column(String(200), nullable=False)   # Source name
-    link = Column(String(1000), nullable=False)
+    link = Column(String(1000), nullable=False, index=True)
+    # Kazınan içeriğin dedup anahtarı (başlık + link özeti); elle eklenenlerde boş
+    content_hash = Column(String(32), nullable=True)
     
     # Dates
-    publish_date = Column(DateTime)
-    extracted_at = Column(DateTime, default=datetime.utcnow)
+    publish_date = Column(UTCDateTime)
+    extracted_at = Column(UTCDateTime, default=_utcnow)
     
     # Swipe status
     status = Column(String(20), default="pending")  # pending, liked, disliked
-    liked_at = Column(DateTime)
-    disliked_at = Column(DateTime)
+    liked_at = Column(UTCDateTime)
+    disliked_at = Column(UTCDateTime)
     
     # Metrics
     popularity_score = Column(Float, default=0.0)
     content_length = Column(Integer, default=0)
     
-    # Relationships
-    ai_contents = relationship("AIContent", back_populates="topic")
+    # Relationships - async oturumda gizli lazy load olmasın; gerekiyorsa selectinload ile açıkça yükle
+    ai_contents = relationship("AIContent", back_populates="topic", lazy="raise")
+    
+    __table_args__ = (
+        # /topics keyset sayfalaması: ORDER BY extracted_at DESC, id DESC (extracted_at aralık sorguları da bunu kullanır)
+        Index("ix_topics_extracted_id", extracted_at.desc(), id.desc()),
+        # WHERE status = ? ORDER BY extracted_at DESC, id DESC (swipe ekranı + status filtreli sayfalama) tek index ile
+        Index("ix_topics_status_extracted_id", status, extracted_at.desc(), id.desc()),
+        # Dedup: INSERT ... ON CONFLICT(content_hash) DO NOTHING (NULL'lar çakışmaz)
+        Index("ix_topics_content_hash", content_hash, unique=True),
+    )
     
     def __repr__(self):
         return f"<Topic(id='{self.id}', title='{self.title[:50]}...', status='{self.status}')>"
 
+class TopicCounter(Base):
+    """Materialized topic counts ('total' + one row per status), kept current by DB triggers"""
+    __tablename__ = "topic_counters"
+    
+    key = Column(String(20), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
 class AIContent(Base):
     """AI generated content model"""
     __tablename__ = "ai_contents"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     
     # Content
     title = Column(String(500), nullable=False)
@@ -119,23 +184,28 @@ class AIContent(Base):
     status = Column(String(20), default="pending")  # pending, generating, completed, failed
     
     # Dates
-    created_at = Column(DateTime, default=datetime.utcnow)
-    started_at = Column(DateTime)
-    completed_at = Column(DateTime)
+    created_at = Column(UTCDateTime, default=_utcnow)
+    started_at = Column(UTCDateTime)
+    completed_at = Column(UTCDateTime)
     
     # Relationships
     topic_id = Column(String, ForeignKey("topics.id"))
-    topic = relationship("Topic", back_populates="ai_contents")
+    topic = relationship("Topic", back_populates="ai_contents", lazy="raise")
     
     # Metrics
     generation_time_seconds = Column(Float)
     content_length = Column(Integer, default=0)
     
+    __table_args__ = (
+        # /ai-content keyset sayfalaması: ORDER BY created_at DESC, id DESC
+        Index("ix_ai_contents_created_id", created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f"<AIContent(id='{self.id}', title='{self.title[:50]}...', status='{self.status}')>"
 
 # Pydantic models for API
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -226,5 +296,5 @@ class StatsResponse(BaseModel):
     # New fields required by frontend
     today_topics: int = 0
     sources_count: int = 0
-    last_update: datetime = datetime.utcnow()
+    last_update: datetime = Field(default_factory=_utcnow)
     scraping_status: str = "idle"  # idle, running, failed 
\ No newline at end of file
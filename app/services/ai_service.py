@@ -6,62 +6,140 @@ Gemini 2.5 Flash integration for content generation
 import google.generativeai as genai
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 import time
 import json
+import os
+import hashlib
 
+from app.core.cache import ResponseCache
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+SETTINGS_FILE = "settings.json"
+MASTER_PROMPT_FILE = "ai_prompts/master_prompt.txt"
+
+# Aynı prompt (çift tıklama, yeniden deneme) için Gemini'ye tekrar para ödeme
+GENERATION_CACHE_TTL = 24 * 60 * 60
+GENERATION_CACHE_SIZE = 128
+
+DEFAULT_MASTER_PROMPT = """
+Sen bir psikoloji alanında uzman içerik üreticisisin. YouTube için kısa, etkileyici ve bilgilendirici videolar üretiyorsun.
+
+Görevin: Verilen konuyu baz alarak, özgün ve ilgi çekici bir YouTube videosu scripti yazmak.
+
+Video formatı:
+- Detaylı ve tam bir YouTube video senaryosu
+- Hook (ilk 3 saniye çok önemli!)
+- Ana mesaj (net ve anlaşılır)
+- Call to action (beğen, yorum yap, takip et)
+- Psikoloji temelli, pratik bilgiler
+- Türkçe dilinde
+
+Yazmana YASAK olanlar:
+- Tıbbi tavsiye vermek
+- Kesin tanı koymak
+- İlaç önerisi
+- Profesyonel terapi yerine geçen öneriler
+
+Stil:
+- Sade ve anlaşılır dil
+- Günlük hayattan örnekler
+- İzleyiciyle direkt konuşma
+- Pozitif ve destekleyici ton
+
+Verilen konu:
+"""
+
 class AIService:
     """AI content generation service using Gemini 2.5 Flash"""
     
     def __init__(self):
         self.settings = get_settings()
         self._model = None
+        self._settings_mtime = None
+        self._settings_data: Dict[str, Any] = {}
+        self._master_prompt: Optional[str] = None
+        self._master_prompt_mtime: Optional[float] = None
+        self._generation_cache = ResponseCache(ttl=GENERATION_CACHE_TTL, maxsize=GENERATION_CACHE_SIZE)
+        self._generations_in_flight: Dict[str, asyncio.Future] = {}
+        # Aynı anda Gemini'ye giden istek sayısı sınırlı; fazlası sırada bekler
+        self._generation_slots = asyncio.Semaphore(self.settings.ai_concurrency)
         self._initialize_genai()
 
-    def _get_api_key_from_file(self) -> Optional[str]:
-        """settings.json içindeki Gemini API anahtarını döndürür (10+ karakter şartı)."""
+    def _get_settings_file_mtime(self) -> Optional[float]:
         try:
-            with open("settings.json", 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
-            api_key = settings_data.get("gemini_api_key")
-            return api_key if api_key and len(api_key) > 10 else None
-        except (FileNotFoundError, json.JSONDecodeError):
+            return os.stat(SETTINGS_FILE).st_mtime
+        except FileNotFoundError:
             return None
 
+    def _refresh_if_settings_changed(self):
+        """Re-initialize Gemini when settings.json changed (e.g. a new API key was saved).
+
+        The service lives for the whole application lifetime, so it must notice key
+        updates made through the Settings page.
+        """
+        if self._get_settings_file_mtime() != self._settings_mtime:
+            self._initialize_genai()
+
+    def _load_settings_file(self) -> Dict[str, Any]:
+        try:
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _get_api_key_from_file(self) -> Optional[str]:
+        """settings.json içindeki Gemini API anahtarını döndürür (10+ karakter şartı)."""
+        api_key = self._settings_data.get("gemini_api_key")
+        return api_key if api_key and len(api_key) > 10 else None
+
     def _get_prompt_from_settings_file(self) -> Optional[str]:
         """settings.json içindeki 'ai_prompt' alanını döndürür."""
+        prompt = self._settings_data.get("ai_prompt")
+        return prompt if prompt and len(prompt) > 20 else None
+
+    def _get_master_prompt(self) -> str:
+        """Return master_prompt.txt, re-reading it only when the file changed (it is editable via the API)."""
         try:
-            with open("settings.json", 'r', encoding='utf-8') as f:
-                settings_data = json.load(f)
-            prompt = settings_data.get("ai_prompt")
-            return prompt if prompt and len(prompt) > 20 else None
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
+            mtime = os.stat(MASTER_PROMPT_FILE).st_mtime
+        except FileNotFoundError:
+            if self._master_prompt is None or self._master_prompt_mtime is not None:
+                logger.warning("Master prompt file not found, using default prompt")
+            self._master_prompt, self._master_prompt_mtime = DEFAULT_MASTER_PROMPT, None
+            return self._master_prompt
+
+        if self._master_prompt is None or mtime != self._master_prompt_mtime:
+            with open(MASTER_PROMPT_FILE, 'r', encoding='utf-8') as f:
+                self._master_prompt = f.read()
+            self._master_prompt_mtime = mtime
+        return self._master_prompt
     
     def _initialize_genai(self):
         """Initialize Gemini AI, prioritizing key from settings.json"""
         # Sadece settings.json kullan; hazır .env anahtarlarını yükleme
+        self._settings_mtime = self._get_settings_file_mtime()
+        self._settings_data = self._load_settings_file()
         api_key = self._get_api_key_from_file()
 
         if not api_key:
+            self._model = None
             logger.warning("⚠️ Gemini API key not set. Kullanıcı Settings ekranından tanımlamalı.")
             return
         
         try:
             genai.configure(api_key=api_key)
             self._model = genai.GenerativeModel(self.settings.default_ai_model)
-            logger.info(f"✅ Gemini {self.settings.default_ai_model} initialized with key from {'settings file' if self._get_api_key_from_file() else '.env'}")
+            logger.info(f"✅ Gemini {self.settings.default_ai_model} initialized with key from settings file")
         except Exception as e:
             logger.error(f"❌ Gemini initialization failed: {e}")
             self._model = None
     
     async def test_connection(self) -> Dict[str, Any]:
         """Test Gemini API connection"""
+        self._refresh_if_settings_changed()
         if not self._model:
             return {
                 "success": False,
@@ -76,7 +154,7 @@ class AIService:
                 "success": True,
                 "model": self.settings.default_ai_model,
                 "response": response[:50] if response else "No response",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
         except Exception as e:
             return {
@@ -102,6 +180,7 @@ class AIService:
         Returns:
             Dict with generated content and metadata
         """
+        self._refresh_if_settings_changed()
         if not self._model:
             return {
                 "success": False,
@@ -116,8 +195,8 @@ class AIService:
             # Build prompt
             prompt = self._build_prompt(topic_title, topic_content, custom_prompt)
             
-            # Generate content
-            generated_text = await self._generate_async(prompt)
+            # Generate content (identical prompts share one Gemini call and its cached result)
+            generated_text, cache_hit = await self._generate_cached(prompt)
             
             generation_time = time.time() - start_time
             
@@ -130,7 +209,8 @@ class AIService:
                     "generation_time_seconds": round(generation_time, 2),
                     "content_length": len(generated_text) if generated_text else 0,
                     "temperature": self.settings.ai_temperature,
-                    "timestamp": datetime.now().isoformat()
+                    "cache_hit": cache_hit,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
             
@@ -142,7 +222,7 @@ class AIService:
                 "generated_content": "",
                 "metadata": {
                     "generation_time_seconds": time.time() - start_time,
-                    "error_timestamp": datetime.now().isoformat()
+                    "error_timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
     
@@ -161,40 +241,8 @@ class AIService:
             base_prompt = self._get_prompt_from_settings_file()
 
             if not base_prompt:
-                # İkinci seçenek: master_prompt.txt dosyası
-                try:
-                    prompt_file_path = "ai_prompts/master_prompt.txt"
-                    with open(prompt_file_path, 'r', encoding='utf-8') as f:
-                        base_prompt = f.read()
-                except FileNotFoundError:
-                    logger.warning("Master prompt file not found, using default prompt")
-                    base_prompt = """
-Sen bir psikoloji alanında uzman içerik üreticisisin. YouTube için kısa, etkileyici ve bilgilendirici videolar üretiyorsun.
-
-Görevin: Verilen konuyu baz alarak, özgün ve ilgi çekici bir YouTube videosu scripti yazmak.
-
-Video formatı:
-- Detaylı ve tam bir YouTube video senaryosu
-- Hook (ilk 3 saniye çok önemli!)
-- Ana mesaj (net ve anlaşılır)
-- Call to action (beğen, yorum yap, takip et)
-- Psikoloji temelli, pratik bilgiler
-- Türkçe dilinde
-
-Yazmana YASAK olanlar:
-- Tıbbi tavsiye vermek
-- Kesin tanı koymak
-- İlaç önerisi
-- Profesyonel terapi yerine geçen öneriler
-
-Stil:
-- Sade ve anlaşılır dil
-- Günlük hayattan örnekler
-- İzleyiciyle direkt konuşma
-- Pozitif ve destekleyici ton
-
-Verilen konu:
-"""
+                # İkinci seçenek: master_prompt.txt dosyası (bellekte önbelleklenmiş)
+                base_prompt = self._get_master_prompt()
         
         # Replace placeholder with actual content
         final_prompt = base_prompt.replace(
@@ -204,25 +252,46 @@ Verilen konu:
         
         return final_prompt
     
+    def _generation_cache_key(self, prompt: str) -> str:
+        raw = f"{self.settings.default_ai_model}|{self.settings.ai_temperature}|{self.settings.ai_max_tokens}|{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _generate_cached(self, prompt: str) -> "tuple[str, bool]":
+        """Return (text, cache_hit); concurrent calls with the same prompt await a single request."""
+        key = self._generation_cache_key(prompt)
+        cached = self._generation_cache.get(key)
+        if cached is not None:
+            return cached, True
+
+        in_flight = self._generations_in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight), True
+
+        task = asyncio.ensure_future(self._generate_async(prompt))
+        self._generations_in_flight[key] = task
+        try:
+            text = await asyncio.shield(task)
+        finally:
+            self._generations_in_flight.pop(key, None)
+        if text:
+            self._generation_cache.set(key, text)
+        return text, False
+
     async def _generate_async(self, prompt: str) -> str:
         """Generate content asynchronously"""
         if not self._model:
             raise Exception("Gemini model not initialized")
         
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        
-        def _sync_generate():
-            response = self._model.generate_content(
+        # Native async client: no default thread pool worker is held while waiting on Gemini
+        async with self._generation_slots:
+            response = await self._model.generate_content_async(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=self.settings.ai_temperature,
                     max_output_tokens=self.settings.ai_max_tokens,
                 )
             )
-            return response.text if response.text else ""
-        
-        return await loop.run_in_executor(None, _sync_generate)
+        return response.text if response.text else ""
     
     def is_available(self) -> bool:
         """Check if AI service is available"""
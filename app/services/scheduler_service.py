@@ -1,165 +1,316 @@
 """
 Scheduler Service for automatic content scraping
-APScheduler integration for daily morning scraping
+Daily morning scraping with a single sleep-until-next-run asyncio task
 """
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
 import asyncio
+import contextlib
+import time
 
 from app.core.config import get_settings
 from app.services.scraper_service import scraper_service
 
 logger = logging.getLogger(__name__)
 
+# Log önekleri: düz ASCII, cp1252 gibi UTF-8 olmayan konsollarda da sorunsuz
+_OK = "[OK]"
+_FAIL = "[FAIL]"
+_SKIP = "[SKIP]"
+_START = "[START]"
+_STATS = "[STATS]"
+_STOP = "[STOP]"
+
+def _ns_to_datetime(timestamp_ns: Optional[int]) -> Optional[datetime]:
+    """Epoch nanoseconds -> aware UTC datetime (only built when a response needs it)."""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
+
+# Durum kodları; API'ye dönerken isim tablosundan çevrilir
+STATUS_IDLE, STATUS_RUNNING, STATUS_FAILED = 0, 1, 2
+_STATUS_NAMES = ("idle", "running", "failed")
+
 # Global scraping status tracking
 class ScrapingStatus:
+    __slots__ = ("_state",)
+    
     def __init__(self):
-        self.status = "idle"  # idle, running, failed
-        self.last_scrape_time = None
-        self.next_scrape_time = None
+        # (status_code, last_scrape_ns, next_scrape_ns) tek bir tuple olarak tek atamayla değişir;
+        # okuyucular yarım güncellenmiş bir durum göremez. Zamanlar epoch nanosaniye olarak tutulur.
+        self._state: Tuple[int, Optional[int], Optional[int]] = (STATUS_IDLE, None, None)
+    
+    def snapshot(self) -> Tuple[int, Optional[int], Optional[int]]:
+        """Consistent (status_code, last_scrape_ns, next_scrape_ns) view."""
+        return self._state
+    
+    @property
+    def status_code(self) -> int:
+        return self._state[0]
+    
+    @property
+    def last_scrape_ns(self) -> Optional[int]:
+        return self._state[1]
+    
+    @property
+    def next_scrape_ns(self) -> Optional[int]:
+        return self._state[2]
+        
+    @property
+    def status(self) -> str:
+        return _STATUS_NAMES[self._state[0]]
+    
+    def _set_status(self, status_code: int):
+        _, last_ns, next_ns = self._state
+        self._state = (status_code, last_ns, next_ns)
         
     def set_running(self):
-        self.status = "running"
+        self._set_status(STATUS_RUNNING)
         
     def set_idle(self):
-        self.status = "idle"
+        self._set_status(STATUS_IDLE)
         
     def set_failed(self):
-        self.status = "failed"
+        self._set_status(STATUS_FAILED)
         
-    def update_last_scrape(self, timestamp: datetime):
-        self.last_scrape_time = timestamp
+    def update_last_scrape(self, timestamp_ns: int):
+        status_code, _, next_ns = self._state
+        self._state = (status_code, timestamp_ns, next_ns)
+        
+    def mark_done(self, success: bool, timestamp_ns: Optional[int] = None):
+        """Finish a run in one swap: idle + last scrape time on success, failed otherwise."""
+        _, last_ns, next_ns = self._state
+        if success:
+            self._state = (STATUS_IDLE, timestamp_ns, next_ns)
+        else:
+            self._state = (STATUS_FAILED, last_ns, next_ns)
         
     def update_next_scrape(self, timestamp: datetime):
-        self.next_scrape_time = timestamp
+        status_code, last_ns, _ = self._state
+        self._state = (status_code, last_ns, int(timestamp.timestamp() * 1e9))
 
 # Global instance
 scraping_status = ScrapingStatus()
 
+@dataclass(slots=True, frozen=True)
+class ScheduleInfo:
+    """Snapshot returned by get_schedule_info; rebuilt only when the schedule state changes."""
+    scheduler_running: bool
+    next_scrape_time: Optional[str]
+    last_scrape_time: Optional[str]
+    schedule: str
+    timezone: str
+    jobs_count: int
+
+# Uzun beklemeler parçalara bölünür: sistem uykusu / saat değişikliği sonrası zaman yeniden kontrol edilir
+MAX_SLEEP_SECONDS = 3600
+
 class SchedulerService:
     """Automatic scheduling service for content scraping"""
     
     def __init__(self):
         self.settings = get_settings()
-        self.scheduler = AsyncIOScheduler(timezone=self.settings.scheduler_timezone)
-        self.scraper_service = None
-        self._is_running = False
+        # Saat dilimi bir kez çözülür; program değişikliklerinde sadece saat/dakika değişir
+        self._tz = ZoneInfo(self.settings.scheduler_timezone)
+        self.scraper_service = scraper_service
+        self._task: Optional[asyncio.Task] = None
+        self._schedule_changed = asyncio.Event()
+        # Sonraki çalışma zamanı sadece iş tetiklenince / program değişince değişir
+        self._cached_next_run: Optional[datetime] = None
+        self._info_cache: Optional[ScheduleInfo] = None
+        # Gösterim metni sadece program değişince yeniden üretilir
+        self._schedule_str = self._format_schedule(self.settings.scrape_schedule_hour, self.settings.scrape_schedule_minute)
+        # Aynı anda en fazla bir kazıma (zamanlanmış veya manuel); aynı kaynaklara paralel yüklenmeyi önler
+        self._scrape_sem = asyncio.Semaphore(1)
+        # Arka plan kazıma task'larına referans tutulur (GC'ye karşı) ve stop() ile iptal edilir
+        self._bg_tasks: set[asyncio.Task] = set()
     
     async def start(self):
         """Start the scheduler"""
         try:
-            # Use enhanced scraper service
-            self.scraper_service = scraper_service
+            loop = asyncio.get_running_loop()
             
-            # Add daily scraping job
-            self.scheduler.add_job(
-                self._scheduled_scrape,
-                CronTrigger(
-                    hour=self.settings.scrape_schedule_hour,
-                    minute=self.settings.scrape_schedule_minute,
-                    timezone=self.settings.scheduler_timezone
-                ),
-                id="daily_scrape",
-                name="Daily Content Scraping",
-                replace_existing=True,
-                max_instances=1
-            )
+            # Python 3.12+: senkron biten coroutine'ler (önbellekli kaynaklar, 304'ler) Task kuyruğuna girmeden çalışır
+            eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+            if eager_task_factory and loop.get_task_factory() is None:
+                loop.set_task_factory(eager_task_factory)
             
-            # Start scheduler
-            self.scheduler.start()
-            self._is_running = True
+            # Tek günlük iş: bir sonraki saate kadar uyuyan uzun ömürlü bir task
+            self._task = asyncio.create_task(self._cron_loop())
             
             # Log next run time and update global status
-            next_run = self.get_next_scrape_time()
-            if next_run:
-                scraping_status.update_next_scrape(next_run)
-            logger.info(f"✅ Scheduler started - Next scrape: {next_run}")
+            next_run = self._refresh_next_run()
+            logger.info("%s Scheduler started on %s loop - Next scrape: %s", _OK, type(loop).__module__, next_run)
             
         except Exception as e:
-            logger.error(f"❌ Scheduler start failed: {e}")
-            self._is_running = False
+            logger.error("%s Scheduler start failed: %s", _FAIL, e)
+            self._task = None
     
     async def stop(self):
         """Stop the scheduler"""
         try:
-            if self.scheduler.running:
-                self.scheduler.shutdown(wait=True)
-            self._is_running = False
-            logger.info("📴 Scheduler stopped")
+            if self._task:
+                self._task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._task
+                self._task = None
+            if self._bg_tasks:
+                tasks = list(self._bg_tasks)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._rebuild_schedule_info()
+            logger.info("%s Scheduler stopped", _STOP)
         except Exception as e:
-            logger.error(f"❌ Scheduler stop failed: {e}")
+            logger.error("%s Scheduler stop failed: %s", _FAIL, e)
+    
+    @staticmethod
+    def _format_schedule(hour: int, minute: int) -> str:
+        return f"Daily at {hour:02d}:{minute:02d}"
+    
+    def _compute_next_run(self) -> datetime:
+        """Next occurrence of the configured HH:MM in the scheduler timezone."""
+        now = datetime.now(self._tz)
+        next_run = now.replace(
+            hour=self.settings.scrape_schedule_hour,
+            minute=self.settings.scrape_schedule_minute,
+            second=0,
+            microsecond=0
+        )
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return next_run
+    
+    async def _cron_loop(self):
+        """Sleep until the next run, scrape, repeat; wakes early when the schedule changes."""
+        while True:
+            self._schedule_changed.clear()
+            next_run = self._refresh_next_run()
+            while (delay := (next_run - datetime.now(self._tz)).total_seconds()) > 0:
+                try:
+                    await asyncio.wait_for(self._schedule_changed.wait(), timeout=min(delay, MAX_SLEEP_SECONDS))
+                    break  # Program değişti; yeni zamanı hesapla
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await self._scheduled_scrape()
     
     async def _scheduled_scrape(self):
         """Scheduled scraping task"""
-        logger.info("🕘 Starting scheduled content scraping...")
+        if self._scrape_sem.locked():
+            logger.warning("%s Scheduled scraping skipped: a scrape is already running", _SKIP)
+            self._refresh_next_run()
+            return
+        
+        logger.info("%s Starting scheduled content scraping...", _START)
         
+        await self._scrape_sem.acquire()
         try:
             # Update status to running
             scraping_status.set_running()
             
-            if not self.scraper_service:
-                self.scraper_service = scraper_service
-            
-            # Run enhanced scraping
+            # Run enhanced scraping (süre monotonik saatle ölçülür; duvar saati sadece gösterim için)
+            started_ns = time.monotonic_ns()
             result = await self.scraper_service.scrape_all_sources()
+            elapsed = (time.monotonic_ns() - started_ns) / 1e9
             
             if result.get("success"):
-                logger.info(f"✅ Enhanced scheduled scraping completed: {result.get('total_new_content', 0)} new items from {result.get('sources_processed', 0)}/{result.get('total_sources', 0)} sources")
-                
-                # Log performance metrics
-                if 'performance' in result:
-                    perf = result['performance']
-                    logger.info(f"📊 Performance: {perf['success_rate']}% success rate, {perf['avg_time_per_source']}s avg per source")
+                # INFO kapalıysa sonuç sözlüğünden değer okuma / biçimlendirme hiç yapılmaz
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "%s Enhanced scheduled scraping completed in %.1fs: %s new items from %s/%s sources",
+                        _OK,
+                        elapsed,
+                        result.get('total_new_content', 0),
+                        result.get('sources_processed', 0),
+                        result.get('total_sources', 0)
+                    )
+                    
+                    # Log performance metrics
+                    perf = result.get('performance')
+                    if perf:
+                        logger.info(
+                            "%s Performance: %s%% success rate, %ss avg per source",
+                            _STATS,
+                            perf['success_rate'],
+                            perf['avg_time_per_source']
+                        )
                 
                 # Update status to idle on success
-                scraping_status.set_idle()
-                scraping_status.update_last_scrape(datetime.utcnow())
+                scraping_status.mark_done(True, time.time_ns())
             else:
-                logger.error(f"❌ Enhanced scheduled scraping failed: {result.get('error', 'Unknown error')}")
-                scraping_status.set_failed()
+                logger.error("%s Enhanced scheduled scraping failed: %s", _FAIL, result.get('error', 'Unknown error'))
+                scraping_status.mark_done(False)
             
         except Exception as e:
-            logger.error(f"❌ Scheduled scraping failed: {e}")
-            scraping_status.set_failed()
+            logger.error("%s Scheduled scraping failed: %s", _FAIL, e)
+            scraping_status.mark_done(False)
+        finally:
+            self._scrape_sem.release()
+            self._refresh_next_run()
     
     async def trigger_manual_scrape(self):
         """Manually trigger scraping outside schedule"""
-        logger.info("🔄 Manual scraping triggered...")
+        if self._scrape_sem.locked():
+            return {
+                "success": False,
+                "error": "scrape already running",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
         
+        logger.info("%s Manual scraping triggered...", _START)
+        
+        # Kontrol ile alma arasında await yok: iki hızlı istek aynı anda geçemez
+        await self._scrape_sem.acquire()
         try:
-            if not self.scraper_service:
-                self.scraper_service = scraper_service
-            
             # Run enhanced scraping in background
-            asyncio.create_task(self.scraper_service.scrape_all_sources())
+            task = asyncio.create_task(self._run_manual_scrape())
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
             
             return {
                 "success": True,
                 "message": "Manual scraping started",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
-            logger.error(f"❌ Manual scraping failed: {e}")
+            self._scrape_sem.release()
+            logger.error("%s Manual scraping failed: %s", _FAIL, e)
             return {
                 "success": False,
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
-    def get_next_scrape_time(self) -> Optional[datetime]:
-        """Get next scheduled scrape time"""
+    async def _run_manual_scrape(self):
         try:
-            job = self.scheduler.get_job("daily_scrape")
-            if job and job.next_run_time:
-                return job.next_run_time
-            return None
-        except:
+            await self.scraper_service.scrape_all_sources()
+        finally:
+            self._scrape_sem.release()
+    
+    def is_scrape_in_progress(self) -> bool:
+        return self._scrape_sem.locked()
+    
+    def _refresh_next_run(self) -> datetime:
+        """Recompute the next run time (called only by writer paths)."""
+        self._cached_next_run = self._compute_next_run()
+        scraping_status.update_next_scrape(self._cached_next_run)
+        self._rebuild_schedule_info()
+        return self._cached_next_run
+    
+    def get_next_scrape_time(self) -> Optional[datetime]:
+        """Get next scheduled scrape time (None while the scheduler is stopped)"""
+        if not self.is_running():
             return None
+        next_run = self._cached_next_run
+        if next_run is not None and next_run > datetime.now(timezone.utc):
+            return next_run
+        return self._refresh_next_run()
     
     def get_last_scrape_time(self) -> Optional[datetime]:
         """Get last scrape time (from database or logs)"""
@@ -169,50 +320,44 @@ class SchedulerService:
     
     def is_running(self) -> bool:
         """Check if scheduler is running"""
-        return self._is_running and self.scheduler.running
+        return self._task is not None and not self._task.done()
+    
+    def _rebuild_schedule_info(self):
+        next_run = self._cached_next_run
+        last_run = self.get_last_scrape_time()
+        self._info_cache = ScheduleInfo(
+            scheduler_running=self.is_running(),
+            next_scrape_time=next_run.isoformat() if next_run else None,
+            last_scrape_time=last_run.isoformat() if last_run else None,
+            schedule=self._schedule_str,
+            timezone=self.settings.scheduler_timezone,
+            jobs_count=1 if self.is_running() else 0
+        )
     
     def get_schedule_info(self) -> dict:
         """Get scheduler information"""
-        next_run = self.get_next_scrape_time()
-        last_run = self.get_last_scrape_time()
-        
-        return {
-            "scheduler_running": self.is_running(),
-            "next_scrape_time": next_run.isoformat() if next_run else None,
-            "last_scrape_time": last_run.isoformat() if last_run else None,
-            "schedule": f"Daily at {self.settings.scrape_schedule_hour:02d}:{self.settings.scrape_schedule_minute:02d}",
-            "timezone": self.settings.scheduler_timezone,
-            "jobs_count": len(self.scheduler.get_jobs())
-        }
+        self.get_next_scrape_time()  # geçmişte kalan bir zaman varsa önbelleği tazeler
+        if self._info_cache is None:
+            self._rebuild_schedule_info()
+        return asdict(self._info_cache)
     
     async def update_schedule(self, hour: int, minute: int = 0):
         """Update scraping schedule"""
         try:
-            # Remove existing job
-            self.scheduler.remove_job("daily_scrape")
-            
-            # Add new job with updated time
-            self.scheduler.add_job(
-                self._scheduled_scrape,
-                CronTrigger(
-                    hour=hour,
-                    minute=minute,
-                    timezone=self.settings.scheduler_timezone
-                ),
-                id="daily_scrape",
-                name="Daily Content Scraping",
-                replace_existing=True,
-                max_instances=1
-            )
-            
-            # Update settings
-            self.settings.scrape_schedule_hour = hour
-            self.settings.scrape_schedule_minute = minute
-            
-            next_run = self.get_next_scrape_time()
-            if next_run:
-                scraping_status.update_next_scrape(next_run)
-            logger.info(f"✅ Schedule updated - Next scrape: {next_run}")
+            unchanged = (hour, minute) == (self.settings.scrape_schedule_hour, self.settings.scrape_schedule_minute)
+            if unchanged and self.is_running() and self._cached_next_run is not None:
+                # Aynı program: döngüyü uyandırıp zamanı yeniden hesaplamaya gerek yok
+                next_run = self.get_next_scrape_time()
+            else:
+                # Update settings
+                self.settings.scrape_schedule_hour = hour
+                self.settings.scrape_schedule_minute = minute
+                self._schedule_str = self._format_schedule(hour, minute)
+                
+                # Uyuyan döngüyü uyandır; yeni saate göre tekrar bekler
+                self._schedule_changed.set()
+                next_run = self._refresh_next_run()
+            logger.info("%s Schedule updated - Next scrape: %s", _OK, next_run)
             
             return {
                 "success": True,
@@ -221,7 +366,7 @@ class SchedulerService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Schedule update failed: {e}")
+            logger.error("%s Schedule update failed: %s", _FAIL, e)
             return {
                 "success": False,
                 "error": str(e)
@@ -229,8 +374,9 @@ class SchedulerService:
 
 def get_current_scraping_status() -> dict:
     """Get current scraping status for API responses"""
+    status_code, last_ns, next_ns = scraping_status.snapshot()
     return {
-        "status": scraping_status.status,
-        "last_scrape_time": scraping_status.last_scrape_time,
-        "next_scrape_time": scraping_status.next_scrape_time
+        "status": _STATUS_NAMES[status_code],
+        "last_scrape_time": _ns_to_datetime(last_ns),
+        "next_scrape_time": _ns_to_datetime(next_ns)
     } 
\ No newline at end of file
@@ -4,19 +4,23 @@ Advanced content extraction with Scrapling, Instaloader, and platform-specific o
 """
 
 import asyncio
+import calendar
 import feedparser
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from sqlalchemy import select, func
-from app.database import get_db
+import functools
+import httpx
+import io
+import itertools
+import lxml.html
+from lxml import etree
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import select, func, update
+from app.database import get_db, dialect_insert
 from app.models import Source, Topic
 import logging
 import time
 import re
 from urllib.parse import urljoin, urlparse
-import json
 from dataclasses import dataclass
 import hashlib
 import os
@@ -31,7 +35,7 @@ except ImportError:
     TwScrapeAPI = None
 
 # Import advanced scraping libraries
-# Scrapling removed - using requests + beautifulsoup for better compatibility
+# Scrapling removed - using httpx + lxml for better compatibility
 SCRAPLING_AVAILABLE = False
 
 try:
@@ -55,6 +59,121 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# YouTube sayfa HTML'inden kanal ID çıkarma (kanal sayfası canonical linki, video sayfası channelId)
+# Web sayfaları doğrudan lxml (C parser) ile parse edilir; sorgular modül yüklenirken derlenen XPath'ler
+FEED_LINK_XPATH = etree.XPath('//link[@type="application/rss+xml" or @type="application/atom+xml"]')
+WEBSITE_TITLE_XPATHS = [
+    etree.XPath('string((//h1)[1])'),
+    etree.XPath('string((//title)[1])'),
+    etree.XPath('string((//meta[@property="og:title"])[1]/@content)'),
+    etree.XPath('string((//meta[@name="twitter:title"])[1]/@content)'),
+]
+WEBSITE_DESCRIPTION_XPATHS = [
+    etree.XPath('string((//meta[@name="description"])[1]/@content)'),
+    etree.XPath('string((//meta[@property="og:description"])[1]/@content)'),
+    etree.XPath('string((//meta[@name="twitter:description"])[1]/@content)'),
+]
+WEBSITE_NOISE_XPATH = etree.XPath('//script|//style|//nav|//header|//footer|//aside')
+WEBSITE_CONTENT_XPATHS = [
+    etree.XPath('(//main)[1]'),
+    etree.XPath('(//article)[1]'),
+    etree.XPath("(//div[re:test(@class, 'content|main|post|article', 'i')])[1]",
+                namespaces={'re': 'http://exslt.org/regular-expressions'}),
+    etree.XPath("(//div[re:test(@id, 'content|main|post|article', 'i')])[1]",
+                namespaces={'re': 'http://exslt.org/regular-expressions'}),
+]
+
+YOUTUBE_CHANNEL_ID_PATTERNS = [
+    re.compile(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'),
+    re.compile(r'"channelId":"(UC[\w-]{22})"'),
+]
+
+# Sık kullanılan regex'ler modül yüklenirken bir kez derlenir
+# Feed keşfinde denenen yaygın yollar ve aynı anda yapılacak en fazla deneme
+COMMON_FEED_PATHS = ['/rss', '/feed', '/atom.xml', '/rss.xml', '/feed.xml', '/feeds/all.atom.xml']
+FEED_PROBE_CONCURRENCY = 8
+# Tam taramada belleğe alınan link penceresi (gün); daha eskiler DB sorgusuyla kontrol edilir
+KNOWN_LINKS_WINDOW_DAYS = 60
+FEED_URL_RE = re.compile(r'(\.rss$|\.xml$|/feed/?$)', re.IGNORECASE)
+# Profil URL'lerinde kullanıcı adı olmayan ilk path parçaları
+TWITTER_RESERVED_PATHS = frozenset({'home', 'search', 'explore', 'notifications', 'messages', 'i', 'settings'})
+
+# Metin temizleme: HTML lxml ile metne çevrilir; regex sadece parse edilemeyen parçalar için yedek
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+ZERO_WIDTH_RE = re.compile(r'[\u200b-\u200f\ufeff]')
+WHITESPACE_RE = re.compile(r'\s+')
+TITLE_PREFIX_RE = re.compile(r'^(RE:|FW:|AW:)\s*', re.IGNORECASE)
+# Spam kalıpları tek bir alternation'da: metin başına tek geçiş
+SPAM_RE = re.compile(
+    r'click here|subscribe now|follow us|limited time|act now|urgent|free gift|100% free|no cost',
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_youtube_channel_id(youtube_url: str) -> str:
+    """Resolve a video/custom YouTube URL to its channel ID with yt-dlp (memoized).
+
+    Raises on failure so that unsuccessful lookups are not cached.
+    """
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(youtube_url, download=False)
+    channel_id = info.get('channel_id') if info else None
+    if not channel_id:
+        raise ValueError(f"No channel ID found for {youtube_url}")
+    logger.info(f"Resolved channel ID {channel_id} from {youtube_url}")
+    return channel_id
+
+FEED_ROOT_TAGS = frozenset({'rss', 'feed', 'RDF'})
+
+def _feed_link_attrs(page: bytes) -> List[Dict[str, str]]:
+    """Attributes of the page's <link rel="alternate"> feed tags; CPU-bound, run via asyncio.to_thread."""
+    if not page.strip():
+        return []
+    return [dict(link.attrib) for link in FEED_LINK_XPATH(lxml.html.document_fromstring(page))]
+
+def _looks_like_feed(body: bytes) -> bool:
+    """Cheap pre-check: read only the root element of `body` and test for rss/feed/RDF.
+
+    Unparseable bodies return True so that feedparser's lenient parser still gets a chance.
+    """
+    try:
+        _, root = next(etree.iterparse(io.BytesIO(body), events=('start',), recover=True,
+                                       resolve_entities=False, no_network=True))
+    except StopIteration:
+        return False
+    except etree.LxmlError:
+        return True
+    return etree.QName(root).localname in FEED_ROOT_TAGS
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second refilled up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # Bekleyenler sırayla geçer; iki coroutine aynı jetonu harcayamaz
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait_time)
+                self.tokens = 0
+                self.updated_at = time.monotonic()
+            else:
+                self.tokens -= 1
+
 @dataclass
 class ScrapingResult:
     """Structured scraping result"""
@@ -70,19 +189,24 @@ class EnhancedScraperService:
     """Enhanced scraper with platform-specific implementations"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'tr-TR,tr;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        # Tüm feed/web istekleri için tek, uzun ömürlü async istemci (keep-alive bağlantı havuzu)
+        # Accept-Encoding httpx'e bırakılır: sadece çözebildiği sıkıştırmaları ilan eder
+        self.http = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=15,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'tr-TR,tr;q=0.9,en;q=0.8',
+                'DNT': '1',
+                'Upgrade-Insecure-Requests': '1'
+            },
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32, keepalive_expiry=30),
+        )
         
-        # Using requests + BeautifulSoup for reliable scraping
-        logger.info("🕷️ Scraper initialized with requests + BeautifulSoup")
+        # Using httpx + lxml for reliable scraping
+        logger.info(f"🕷️ Scraper initialized with httpx + lxml (Accept-Encoding: {self.http.headers.get('Accept-Encoding')})")
         
         # Initialize Instaloader if available
         if INSTALOADER_AVAILABLE:
@@ -107,8 +231,11 @@ class EnhancedScraperService:
             'default': {'requests_per_minute': 60, 'delay_between_requests': 1.0}
         }
         
-        # Track last request times for rate limiting
-        self.last_requests = {}
+        # Platform başına token bucket: dakikalık bütçe eşzamanlı kazımada da korunur
+        self.rate_buckets = {
+            platform: TokenBucket(limits['requests_per_minute'] / 60, max(1.0, limits['requests_per_minute'] / 60))
+            for platform, limits in self.rate_limits.items()
+        }
 
         # TwScrape API oturumu
         self.twitter_api = None  # TwScrapeAPI instance
@@ -128,6 +255,9 @@ class EnhancedScraperService:
             "duration": 0
         }
 
+        # Tarama boyunca son KNOWN_LINKS_WINDOW_DAYS günün linkleri: bunlar DB'ye sorulmadan elenir
+        self._known_links: Optional[set] = None
+
         # Content quality thresholds
         self.quality_thresholds = {
             'min_title_length': 10,
@@ -136,6 +266,17 @@ class EnhancedScraperService:
             'max_content_length': 5000
         }
 
+    async def close(self):
+        """Close the shared HTTP client (called on application shutdown)."""
+        await self.http.aclose()
+
+    async def _fetch_feed(self, url: str, timeout: float = 15) -> feedparser.FeedParserDict:
+        """Download a feed with the shared client and parse it."""
+        response = await self.http.get(url, timeout=timeout)
+        response.raise_for_status()
+        # feedparser saf Python; parse iş parçacığında çalışır, döngü diğer istekleri beklemeye devam eder
+        return await asyncio.to_thread(feedparser.parse, response.content)
+
     async def scrape_all_sources(self) -> Dict[str, Any]:
         """Enhanced scraping with better error handling and statistics"""
         # 1. Reset status and set to "running"
@@ -145,11 +286,11 @@ class EnhancedScraperService:
             "current_source": "Başlatılıyor...",
             "new_content_count": 0,
             "errors": [],
-            "start_time": datetime.utcnow().isoformat(),
+            "start_time": datetime.now(timezone.utc).isoformat(),
             "end_time": None,
             "duration": 0
         }
-        start_time = datetime.utcnow()
+        start_time = datetime.now(timezone.utc)
         
         try:
             # Get all active sources
@@ -158,6 +299,12 @@ class EnhancedScraperService:
                     select(Source).where(Source.is_active == True)
                 )
                 sources = result.scalars().all()
+                if sources:
+                    # Tek sorgu, sınırlı pencere: bellek tüm tabloyla değil son N günün hacmiyle büyür
+                    window_start = datetime.now(timezone.utc) - timedelta(days=KNOWN_LINKS_WINDOW_DAYS)
+                    self._known_links = set((await db.execute(
+                        select(Topic.link).where(Topic.extracted_at >= window_start)
+                    )).scalars())
             
             if not sources:
                 return {
@@ -177,19 +324,34 @@ class EnhancedScraperService:
             errors = []
             results_by_platform = {}
             
-            # Process sources with rate limiting
-            for i, source in enumerate(sources):
-                self.scraping_status["progress"]["processed"] = i + 1
-                self.scraping_status["current_source"] = source.name
-
-                try:
+            # Kaynaklar paralel kazınır; aynı platforma aynı anda giden istek sayısı
+            # dakikalık limitten türetilen semaphore ile sınırlanır
+            platform_slots = {
+                platform: asyncio.Semaphore(max(1, limits['requests_per_minute'] // 60))
+                for platform, limits in self.rate_limits.items()
+            }
+            
+            async def scrape_one(source: Source):
+                async with platform_slots.get(source.platform.lower(), platform_slots['default']):
+                    self.scraping_status["current_source"] = source.name
                     # Apply rate limiting
                     await self._apply_rate_limiting(source.platform)
-                    
                     logger.info(f"Scraping source: {source.name} ({source.platform})")
+                    try:
+                        return source, await self._scrape_source_enhanced(source)
+                    except Exception as e:
+                        return source, e
+            
+            # Process sources as they finish (progress follows completion order)
+            for i, next_done in enumerate(asyncio.as_completed([scrape_one(s) for s in sources])):
+                source, result = await next_done
+                self.scraping_status["progress"]["processed"] = i + 1
+
+                try:
+                    if isinstance(result, Exception):
+                        raise result
                     
-                    result = await self._scrape_source_enhanced(source)
-                    
+
                     if result.success:
                         total_new_content += result.new_content_count
                         self.scraping_status["new_content_count"] = total_new_content
@@ -203,13 +365,7 @@ class EnhancedScraperService:
                         results_by_platform[source.platform]['sources'] += 1
                         results_by_platform[source.platform]['new_content'] += result.new_content_count
                         
-                        # Update source's last scraped time
-                        async with get_db() as db:
-                            source.last_scraped_at = datetime.utcnow()
-                            source.last_content_count = result.new_content_count
-                            source.total_content_count += result.new_content_count
-                            await db.commit()
-                            
+                        # Kaynağın last_scraped_at / sayaçları _save_topics içinde aynı transaction'da güncellenir
                         logger.info(f"✅ {source.name}: {result.new_content_count} new items")
                     else:
                         error_msg = f"{source.name} ({source.platform}): {result.error}"
@@ -227,11 +383,11 @@ class EnhancedScraperService:
                     self.scraping_status["errors"].append(error_msg)
                     logger.error(f"💥 {error_msg}")
             
-            duration = (datetime.utcnow() - start_time).total_seconds()
+            duration = (datetime.now(timezone.utc) - start_time).total_seconds()
             
             # 2. Update status to "completed"
             self.scraping_status["status"] = "completed"
-            self.scraping_status["end_time"] = datetime.utcnow().isoformat()
+            self.scraping_status["end_time"] = datetime.now(timezone.utc).isoformat()
             self.scraping_status["duration"] = round(duration, 2)
 
             # Enhanced response with detailed statistics
@@ -245,7 +401,7 @@ class EnhancedScraperService:
                 "errors": errors,
                 "error_count": len(errors),
                 "results_by_platform": results_by_platform,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "performance": {
                     "avg_time_per_source": round(duration / len(sources), 2) if sources else 0,
                     "success_rate": round((sources_processed / len(sources)) * 100, 2) if sources else 0,
@@ -260,7 +416,7 @@ class EnhancedScraperService:
             # 3. Update status to "failed" on fatal error
             self.scraping_status["status"] = "failed"
             self.scraping_status["errors"].append(f"Fatal error: {str(e)}")
-            self.scraping_status["end_time"] = datetime.utcnow().isoformat()
+            self.scraping_status["end_time"] = datetime.now(timezone.utc).isoformat()
 
             logger.error(f"Fatal scraping error: {str(e)}")
             return {
@@ -268,25 +424,105 @@ class EnhancedScraperService:
                 "error": f"Fatal error during scraping: {str(e)}",
                 "total_new_content": 0,
                 "sources_processed": 0,
-                "duration_seconds": (datetime.utcnow() - start_time).total_seconds(),
+                "duration_seconds": (datetime.now(timezone.utc) - start_time).total_seconds(),
                 "errors": [str(e)]
             }
+        finally:
+            self._known_links = None
 
-    async def _apply_rate_limiting(self, platform: str):
-        """Apply intelligent rate limiting based on platform"""
-        platform_limits = self.rate_limits.get(platform, self.rate_limits['default'])
-        delay = platform_limits['delay_between_requests']
+    async def _fetch_feed_if_changed(self, source: Source, url: str):
+        """Conditional feed fetch using the source's stored ETag / Last-Modified.
+
+        Returns None on 304 Not Modified, else (feed, validators to store on the source).
+        Servers without ETag support get a HEAD preflight: an unchanged Content-Length and
+        Last-Modified also count as not modified.
+        """
+        if not source.etag and source.last_content_length and source.last_modified:
+            try:
+                head = await self.http.head(url, timeout=10)
+                if (head.status_code == 200
+                        and head.headers.get('Last-Modified') == source.last_modified
+                        and head.headers.get('Content-Length') == str(source.last_content_length)):
+                    return None
+            except httpx.HTTPError as e:
+                logger.debug(f"HEAD preflight failed for {url}: {e}")
         
-        # Check if we need to wait
-        last_request_key = f"{platform}_last_request"
-        if last_request_key in self.last_requests:
-            time_since_last = time.time() - self.last_requests[last_request_key]
-            if time_since_last < delay:
-                wait_time = delay - time_since_last
-                logger.debug(f"Rate limiting: waiting {wait_time:.2f}s for {platform}")
-                await asyncio.sleep(wait_time)
+        headers = {}
+        if source.etag:
+            headers['If-None-Match'] = source.etag
+        if source.last_modified:
+            headers['If-Modified-Since'] = source.last_modified
         
-        self.last_requests[last_request_key] = time.time()
+        response = await self.http.get(url, headers=headers, timeout=15)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        
+        content_length = response.headers.get('Content-Length')
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'last_content_length': int(content_length) if content_length and content_length.isdigit() else None
+        }
+        return await asyncio.to_thread(feedparser.parse, response.content), validators
+
+    async def _save_topics(self, source: Source, candidates: List[Dict[str, Any]], source_values: Optional[Dict[str, Any]] = None) -> int:
+        """Insert the non-duplicate candidate rows and update the source's counters in one transaction.
+
+        During a full scrape, links in the run's recent known-link set are dropped without a
+        query; the remaining links are checked with one indexed IN query; content hash duplicates
+        (in the DB or within the batch) are dropped by the unique index via ON CONFLICT DO NOTHING.
+        source_values: extra Source columns to write in the same UPDATE (e.g. feed validators).
+        Returns the number of topics inserted.
+        """
+        new_count = 0
+        async with get_db() as db:
+            if candidates:
+                links = {row['link'] for row in candidates}
+                seen_links = set()
+                if self._known_links is not None:
+                    seen_links = links & self._known_links  # Yakın zamanda kaydedilmiş: kesin tekrar
+                    links -= seen_links
+                if links:
+                    # Pencere dışındaki (eski) kayıtlar indeksli IN sorgusuyla yakalanır
+                    seen_links.update((await db.execute(
+                        select(Topic.link).where(Topic.link.in_(links))
+                    )).scalars())
+                
+                rows = []
+                for row in candidates:
+                    if row['link'] in seen_links:
+                        continue
+                    seen_links.add(row['link'])
+                    rows.append(row)
+                
+                if rows:
+                    # Tek çok satırlı INSERT (executemany yerine tek statement)
+                    result = await db.execute(
+                        dialect_insert(Topic.__table__).values(rows).on_conflict_do_nothing(index_elements=['content_hash'])
+                    )
+                    new_count = result.rowcount
+                    if self._known_links is not None:
+                        self._known_links.update(row['link'] for row in rows)
+            
+            if source.id is not None:  # test_source_enhanced kaydedilmemiş geçici kaynak kullanır
+                await db.execute(
+                    update(Source)
+                    .where(Source.id == source.id)
+                    .values(
+                        last_scraped_at=datetime.now(timezone.utc),
+                        last_content_count=new_count,
+                        total_content_count=func.coalesce(Source.total_content_count, 0) + new_count,
+                        **(source_values or {})
+                    )
+                )
+            await db.commit()
+        return new_count
+
+    async def _apply_rate_limiting(self, platform: str):
+        """Apply intelligent rate limiting based on platform"""
+        bucket = self.rate_buckets.get(platform.lower(), self.rate_buckets['default'])
+        await bucket.acquire()
 
     # ------------------------------------------------------------------
     # Twitter Authentication (TwScrape)
@@ -310,7 +546,7 @@ class EnhancedScraperService:
                 await self.twitter_api.pool.add_account(username, password, email or "", email_password or "")
             except Exception as e:
                 # Hesap zaten ekli olabilir
-                self.logger.debug(f"TwScrape account add: {e}")
+                logger.debug(f"TwScrape account add: {e}")
 
             await self.twitter_api.pool.login_all()
 
@@ -318,11 +554,11 @@ class EnhancedScraperService:
             if not self.twitter_api.pool.is_logged_in:
                 return {"success": False, "error": "Twitter girişi başarısız"}
 
-            self.logger.info(f"✅ TwScrape login başarılı: @{username}")
+            logger.info(f"✅ TwScrape login başarılı: @{username}")
             return {"success": True, "message": "Twitter oturumu açıldı"}
 
         except Exception as e:
-            self.logger.error(f"TwScrape login error: {e}")
+            logger.error(f"TwScrape login error: {e}")
             return {"success": False, "error": str(e)}
 
     async def _scrape_source_enhanced(self, source: Source) -> ScrapingResult:
@@ -331,7 +567,7 @@ class EnhancedScraperService:
             platform = source.platform.lower()
 
             # Heuristic: If platform is website but URL indicates feed, override to RSS
-            if platform == "website" and re.search(r"(\.rss$|\.xml$|/feed/?$)", source.url, re.IGNORECASE):
+            if platform == "website" and FEED_URL_RE.search(source.url):
                 logger.debug(f"🔍 RSS feed detected from website source, switching platform for this run")
                 platform = "rss"
 
@@ -359,7 +595,8 @@ class EnhancedScraperService:
     async def _scrape_youtube_enhanced(self, source: Source) -> ScrapingResult:
         """Enhanced YouTube scraping with better content extraction"""
         try:
-            rss_url = self._get_youtube_rss_url(source.url)
+            # Çözümlenmiş feed URL'si kaynakta saklanır; her taramada sayfa/yt-dlp turu yapılmaz
+            rss_url = source.rss_url or self._get_youtube_rss_url(source.url)
             if not rss_url:
                 return ScrapingResult(
                     success=False,
@@ -368,22 +605,25 @@ class EnhancedScraperService:
                     source_name=source.name
                 )
             
-            logger.debug(f"Fetching YouTube RSS: {rss_url}")
-            feed = feedparser.parse(rss_url)
+            resolved = {} if source.rss_url else {'rss_url': rss_url}
             
-            if not feed.entries:
-                return ScrapingResult(
-                    success=True,
-                    new_content_count=0,
-                    source_name=source.name
-                )
+            logger.debug(f"Fetching YouTube RSS: {rss_url}")
+            fetched = await self._fetch_feed_if_changed(source, rss_url)
+            if fetched is None:
+                # 304: feed değişmemiş, yeni içerik yok
+                await self._save_topics(source, [], resolved)
+                return ScrapingResult(success=True, new_content_count=0, source_name=source.name)
+            feed, validators = fetched
+            validators.update(resolved)
             
-            new_content_count = 0
+            candidates = []
             skipped_count = 0
             processed_count = 0
             
             # Process entries (limit to 15 for performance)
             for entry in feed.entries[:15]:
+                if source.latest_entry_id and self._entry_id(entry) == source.latest_entry_id:
+                    break  # Buradan sonrası önceki taramada işlendi
                 processed_count += 1
                 
                 # Enhanced content validation
@@ -391,48 +631,30 @@ class EnhancedScraperService:
                     skipped_count += 1
                     continue
                 
-                # Check for duplicates using multiple methods
+                # Content hash for duplicate detection (checked in batch by _save_topics)
                 content_hash = self._generate_content_hash(entry.title, entry.link)
                 
-                async with get_db() as db:
-                    # Check by URL
-                    existing_by_url = await db.execute(
-                        select(Topic).where(Topic.link == entry.link)
-                    )
-                    if existing_by_url.scalar_one_or_none():
-                        skipped_count += 1
-                        continue
-                    
-                    # Check by content hash (prevents near-duplicates)
-                    existing_by_hash = await db.execute(
-                        select(Topic).where(Topic.description == content_hash)
-                    )
-                    if existing_by_hash.scalar_one_or_none():
-                        skipped_count += 1
-                        continue
-                
                 # Extract enhanced metadata
                 video_description = self._extract_youtube_description(entry)
                 video_duration = self._extract_youtube_duration(entry)
                 
-                topic = Topic(
+                topic = dict(
                     title=self._clean_title(entry.title),
-                    description=content_hash,  # Store hash for duplicate detection
+                    content_hash=content_hash,
                     content=self._clean_content(video_description),
                     platform="YouTube",
                     source=source.name,
                     link=entry.link,
-                    publish_date=datetime(*entry.published_parsed[:6]) if entry.get('published_parsed') else datetime.utcnow(),
+                    publish_date=self._published_at(entry) or datetime.now(timezone.utc),
                     popularity_score=self._calculate_youtube_popularity(entry),
                     content_length=len(video_description)
                 )
-                
-                async with get_db() as db:
-                    db.add(topic)
-                    await db.commit()
-                
-                new_content_count += 1
-                logger.debug(f"✅ Added YouTube video: {entry.title}")
+                candidates.append(topic)
+            
+            if feed.entries:
+                validators['latest_entry_id'] = self._entry_id(feed.entries[0])
+            new_content_count = await self._save_topics(source, candidates, validators)
+            skipped_count += len(candidates) - new_content_count
             
             return ScrapingResult(
                 success=True,
@@ -456,25 +678,20 @@ class EnhancedScraperService:
         try:
             logger.debug(f"Fetching RSS feed: {source.url}")
             
-            # Add timeout and better error handling
-            response = self.session.get(source.url, timeout=15)
-            response.raise_for_status()
-            
-            # Use feedparser directly (it handles XML properly)
-            feed = feedparser.parse(response.text)
+            # Conditional GET: değişmemiş feed 304 döner, indirme ve parse atlanır
+            fetched = await self._fetch_feed_if_changed(source, source.url)
+            if fetched is None:
+                await self._save_topics(source, [])
+                return ScrapingResult(success=True, new_content_count=0, source_name=source.name)
+            feed, validators = fetched
             
-            if not feed.entries:
-                return ScrapingResult(
-                    success=True,
-                    new_content_count=0,
-                    source_name=source.name
-                )
-            
-            new_content_count = 0
+            candidates = []
             skipped_count = 0
             processed_count = 0
             
             for entry in feed.entries[:20]:  # Increased limit for RSS
+                if source.latest_entry_id and self._entry_id(entry) == source.latest_entry_id:
+                    break  # Buradan sonrası önceki taramada işlendi
                 processed_count += 1
                 
                 # Enhanced content validation
@@ -486,38 +703,26 @@ class EnhancedScraperService:
                     skipped_count += 1
                     continue
                 
-                # Duplicate detection
+                # Duplicate detection (checked in batch by _save_topics)
                 content_hash = self._generate_content_hash(title, entry.get('link', ''))
                 
-                async with get_db() as db:
-                    existing = await db.execute(
-                        select(Topic).where(
-                            (Topic.link == entry.get('link')) |
-                            (Topic.description == content_hash)
-                        )
-                    )
-                    if existing.scalar_one_or_none():
-                        skipped_count += 1
-                        continue
-                
-                topic = Topic(
+                topic = dict(
                     title=self._clean_title(title),
-                    description=content_hash,
+                    content_hash=content_hash,
                     content=self._clean_content(content),
                     platform=source.platform,
                     source=source.name,
                     link=entry.get('link', ''),
-                    publish_date=datetime(*entry.published_parsed[:6]) if entry.get('published_parsed') else datetime.utcnow(),
+                    publish_date=self._published_at(entry) or datetime.now(timezone.utc),
                     popularity_score=self._calculate_rss_popularity(entry),
                     content_length=len(content)
                 )
-                
-                async with get_db() as db:
-                    db.add(topic)
-                    await db.commit()
-                
-                new_content_count += 1
-                logger.debug(f"✅ Added RSS item: {title}")
+                candidates.append(topic)
+            
+            if feed.entries:
+                validators['latest_entry_id'] = self._entry_id(feed.entries[0])
+            new_content_count = await self._save_topics(source, candidates, validators)
+            skipped_count += len(candidates) - new_content_count
             
             return ScrapingResult(
                 success=True,
@@ -561,27 +766,19 @@ class EnhancedScraperService:
             
             # Get profile and posts
             try:
-                profile = instaloader.Profile.from_username(self.instagram_loader.context, profile_name)
-                
-                new_posts = 0
+                candidates = []
                 processed_posts = 0
                 
+                # Instaloader is blocking; fetch in a worker thread so other platforms keep running.
                 # Limit to recent posts to avoid rate limiting
-                posts_to_process = list(profile.get_posts())[:10]  # Last 10 posts
+                posts_to_process = await asyncio.to_thread(self._fetch_instagram_posts, profile_name, 10)
                 
                 for post in posts_to_process:
                     processed_posts += 1
                     
-                    # Check for duplicates using post URL
+                    # Post URL doubles as the duplicate key (checked in batch by _save_topics)
                     post_url = f"https://www.instagram.com/p/{post.shortcode}/"
                     
-                    async with get_db() as db:
-                        existing = await db.execute(
-                            select(Topic).where(Topic.link == post_url)
-                        )
-                        if existing.scalar_one_or_none():
-                            continue
-                    
                     # Extract post content
                     caption = post.caption or ""
                     
@@ -593,35 +790,20 @@ class EnhancedScraperService:
                     popularity = self._calculate_instagram_popularity(post)
                     
                     # Create topic
-                    topic = Topic(
+                    topic = dict(
                         title=self._clean_title(caption[:100] if caption else f"Instagram Post by @{profile_name}"),
-                        description=self._generate_content_hash(caption, post_url),
+                        content_hash=self._generate_content_hash(caption, post_url),
                         content=self._clean_content(caption),
                         platform="Instagram",
                         source=source.name,
                         link=post_url,
                         publish_date=post.date_utc,
                         popularity_score=popularity,
-                        content_length=len(caption),
-                        metadata=json.dumps({
-                            "profile": profile_name,
-                            "shortcode": post.shortcode,
-                            "likes": post.likes,
-                            "comments": post.comments,
-                            "is_video": post.is_video,
-                            "typename": post.typename
-                        })
+                        content_length=len(caption)
                     )
-                    
-                    async with get_db() as db:
-                        db.add(topic)
-                        await db.commit()
-                    
-                    new_posts += 1
-                    
-                    # Rate limiting between posts
-                    await asyncio.sleep(0.5)
+                    candidates.append(topic)
                 
+                new_posts = await self._save_topics(source, candidates)
                 logger.info(f"✅ Instagram {profile_name}: {new_posts} new posts from {processed_posts} processed")
                 
                 return ScrapingResult(
@@ -676,7 +858,7 @@ class EnhancedScraperService:
             if TWSCRAPE_AVAILABLE and self.twitter_api and self.twitter_api.pool.is_logged_in:
                 try:
                     tweets = await self.twitter_api.user_tweets(username, limit=10)
-                    new_tweets = 0
+                    candidates = []
                     processed_tweets = 0
 
                     for tw in tweets:
@@ -690,34 +872,21 @@ class EnhancedScraperService:
                         link = f"https://twitter.com/{username}/status/{tw.id}"
                         content_hash = self._generate_content_hash(title, link)
 
-                        async with get_db() as db:
-                            existing = await db.execute(
-                                select(Topic).where(
-                                    (Topic.link == link) | (Topic.description == content_hash)
-                                )
-                            )
-                            if existing.scalar_one_or_none():
-                                continue
-
-                        topic = Topic(
+                        topic = dict(
                             title=self._clean_title(title),
-                            description=content_hash,
+                            content_hash=content_hash,
                             content=self._clean_content(content),
                             platform="Twitter",
                             source=source.name,
                             link=link,
-                            publish_date=tw.created_at or datetime.utcnow(),
+                            publish_date=tw.created_at or datetime.now(timezone.utc),
                             popularity_score= min(len(content) / 10, 100),
                             content_length=len(content)
                         )
+                        candidates.append(topic)
 
-                        async with get_db() as db:
-                            db.add(topic)
-                            await db.commit()
-
-                        new_tweets += 1
-
-                    self.logger.info(f"✅ TwScrape @{username}: {new_tweets} new tweets from {processed_tweets} processed")
+                    new_tweets = await self._save_topics(source, candidates)
+                    logger.info(f"✅ TwScrape @{username}: {new_tweets} new tweets from {processed_tweets} processed")
 
                     return ScrapingResult(
                         success=True,
@@ -726,16 +895,18 @@ class EnhancedScraperService:
                         source_name=source.name
                     )
                 except Exception as tw_err:
-                    self.logger.warning(f"TwScrape error: {tw_err}")
+                    logger.warning(f"TwScrape error: {tw_err}")
 
             # 2) Scrapling yöntemi (varsa)
-            new_tweets = 0
+            candidates = []
             processed_tweets = 0
             # Use Scrapling for stealth scraping if available
             if SCRAPLING_AVAILABLE:
                 try:
                     # Try to scrape Twitter profile page with stealth mode
-                    page = StealthyFetcher.fetch(
+                    # Headless tarayıcı bloklayıcı; event loop'u tutmaması için thread'de çalışır
+                    page = await asyncio.to_thread(
+                        StealthyFetcher.fetch,
                         source.url,
                         headless=True,
                         network_idle=True
@@ -757,56 +928,39 @@ class EnhancedScraperService:
                             
                         tweet_text = tweet_text_elem.text or ""
                         
+                        # Skip if content quality is insufficient (before any further DOM queries)
+                        if not self._is_content_quality_sufficient(tweet_text[:50], tweet_text):
+                            continue
+                        
                         # Extract tweet link (if available)
+                        link = source.url
                         time_elem = tweet_elem.css('time').first
-                        tweet_url = ""
                         if time_elem and time_elem.parent:
                             href = time_elem.parent.get('href')
                             if href:
-                                tweet_url = f"https://twitter.com{href}"
-                        
-                        # Skip if content quality is insufficient
-                        if not self._is_content_quality_sufficient(tweet_text[:50], tweet_text):
-                            continue
-                        
-                        # Check for duplicates
-                        content_hash = self._generate_content_hash(tweet_text, tweet_url or source.url)
+                                link = f"https://twitter.com{href}"
                         
-                        async with get_db() as db:
-                            existing = await db.execute(
-                                select(Topic).where(Topic.description == content_hash)
-                            )
-                            if existing.scalar_one_or_none():
-                                continue
+                        # Content hash for duplicate detection (checked in batch by _save_topics)
+                        content_hash = self._generate_content_hash(tweet_text, link)
                         
                         # Calculate popularity score
                         popularity = self._calculate_twitter_popularity(tweet_elem)
                         
                         # Create topic
-                        topic = Topic(
-                            title=self._clean_title(tweet_text[:100] if tweet_text else f"Tweet by @{username}"),
-                            description=content_hash,
+                        topic = dict(
+                            title=self._clean_title(tweet_text[:100]),  # Quality check guarantees non-empty text
+                            content_hash=content_hash,
                             content=self._clean_content(tweet_text),
                             platform="Twitter",
                             source=source.name,
-                            link=tweet_url or source.url,
-                            publish_date=datetime.utcnow(),  # Twitter timestamps are complex to parse
+                            link=link,
+                            publish_date=datetime.now(timezone.utc),  # Twitter timestamps are complex to parse
                             popularity_score=popularity,
-                            content_length=len(tweet_text),
-                            metadata=json.dumps({
-                                "username": username,
-                                "tweet_url": tweet_url
-                            })
+                            content_length=len(tweet_text)
                         )
-                        
-                        async with get_db() as db:
-                            db.add(topic)
-                            await db.commit()
-                        
-                        new_tweets += 1
-                        
-                        # Rate limiting between tweets
-                        await asyncio.sleep(0.3)
+                        candidates.append(topic)
+                    
+                    new_tweets = await self._save_topics(source, candidates)
                         
                 except Exception as scrapling_error:
                     logger.warning(f"Scrapling Twitter scraping failed: {scrapling_error}")
@@ -842,7 +996,9 @@ class EnhancedScraperService:
             # Use Scrapling for advanced scraping if available
             if SCRAPLING_AVAILABLE:
                 try:
-                    page = StealthyFetcher.fetch(
+                    # Headless tarayıcı bloklayıcı; event loop'u tutmaması için thread'de çalışır
+                    page = await asyncio.to_thread(
+                        StealthyFetcher.fetch,
                         source.url,
                         headless=True,
                         network_idle=True
@@ -877,23 +1033,20 @@ class EnhancedScraperService:
                 except Exception as scrapling_error:
                     logger.warning(f"Scrapling website scraping failed, using fallback: {scrapling_error}")
                     # Fall back to traditional scraping
-                    response = self.session.get(source.url, timeout=15)
+                    response = await self.http.get(source.url, timeout=15)
                     response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    title = self._extract_website_title(soup)
-                    content = self._extract_website_content(soup)
+                    title, content = await asyncio.to_thread(self._parse_html_sync, response.content)
             else:
                 # Traditional scraping method
-                response = self.session.get(source.url, timeout=15)
+                response = await self.http.get(source.url, timeout=15)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                title = self._extract_website_title(soup)
-                content = self._extract_website_content(soup)
+                title, content = await asyncio.to_thread(self._parse_html_sync, response.content)
             
             # Enhanced content extraction
             description = content[:200] if content else ""
             
             if not self._is_content_quality_sufficient(title, content):
+                await self._save_topics(source, [])
                 return ScrapingResult(
                     success=True,
                     new_content_count=0,
@@ -901,43 +1054,27 @@ class EnhancedScraperService:
                     error="Content quality below threshold"
                 )
             
-            # Check for duplicates
+            # Content hash for duplicate detection (checked by _save_topics)
             content_hash = self._generate_content_hash(title, source.url)
             
-            async with get_db() as db:
-                existing = await db.execute(
-                    select(Topic).where(
-                        (Topic.link == source.url) |
-                        (Topic.description == content_hash)
-                    )
-                )
-                if existing.scalar_one_or_none():
-                    return ScrapingResult(
-                        success=True,
-                        new_content_count=0,
-                        skipped_count=1,
-                        source_name=source.name
-                    )
-            
-            topic = Topic(
+            topic = dict(
                 title=self._clean_title(title),
-                description=content_hash,
+                content_hash=content_hash,
                 content=self._clean_content(content),
                 platform="Website",
                 source=source.name,
                 link=source.url,
-                publish_date=datetime.utcnow(),
+                publish_date=datetime.now(timezone.utc),
                 popularity_score=len(content) // 10,  # Simple popularity metric
                 content_length=len(content)
             )
             
-            async with get_db() as db:
-                db.add(topic)
-                await db.commit()
+            new_content_count = await self._save_topics(source, [topic])
             
             return ScrapingResult(
                 success=True,
-                new_content_count=1,
+                new_content_count=new_content_count,
+                skipped_count=1 - new_content_count,
                 processed_count=1,
                 source_name=source.name
             )
@@ -954,33 +1091,19 @@ class EnhancedScraperService:
     # Helper methods for content processing
     def _is_content_quality_sufficient(self, title: str, content: str) -> bool:
         """Check if content meets quality thresholds"""
-        if len(title) < self.quality_thresholds['min_title_length']:
+        thresholds = self.quality_thresholds
+        if not (thresholds['min_title_length'] <= len(title) <= thresholds['max_title_length']
+                and thresholds['min_content_length'] <= len(content) <= thresholds['max_content_length']):
             return False
-        if len(content) < self.quality_thresholds['min_content_length']:
-            return False
-        if len(title) > self.quality_thresholds['max_title_length']:
-            return False
-        if len(content) > self.quality_thresholds['max_content_length']:
-            return False
-        
-        # Check for spam patterns
-        spam_patterns = [
-            r'(?i)(click here|subscribe now|follow us)',
-            r'(?i)(limited time|act now|urgent)',
-            r'(?i)(free gift|100% free|no cost)'
-        ]
-        
-        combined_text = f"{title} {content}"
-        for pattern in spam_patterns:
-            if re.search(pattern, combined_text):
-                return False
         
-        return True
+        # Check for spam patterns: the short title first, the content scan only if it is clean
+        return not (SPAM_RE.search(title) or SPAM_RE.search(content))
 
     def _generate_content_hash(self, title: str, url: str) -> str:
         """Generate a hash for content deduplication"""
-        content_key = f"{title.lower().strip()}{url.strip()}"
-        return hashlib.md5(content_key.encode()).hexdigest()
+        # BLAKE2b-128: MD5 ile aynı uzunlukta (32 hex) ama daha hızlı ve çakışmaya dayanıklı
+        content_key = f"{title.lower().strip()}|{url.strip()}"
+        return hashlib.blake2b(content_key.encode('utf-8', 'ignore'), digest_size=16).hexdigest()
 
     def _clean_title(self, title: str) -> str:
         """Clean and normalize title"""
@@ -988,8 +1111,7 @@ class EnhancedScraperService:
             return "Untitled"
         
         # Remove extra whitespace and common prefixes
-        title = re.sub(r'\s+', ' ', title.strip())
-        title = re.sub(r'^(RE:|FW:|AW:)\s*', '', title, flags=re.IGNORECASE)
+        title = TITLE_PREFIX_RE.sub('', WHITESPACE_RE.sub(' ', title).strip())
         
         return title[:self.quality_thresholds['max_title_length']]
 
@@ -998,12 +1120,29 @@ class EnhancedScraperService:
         if not content:
             return ""
         
-        # Remove HTML tags, extra whitespace, and normalize
-        content = re.sub(r'<[^>]+>', '', content)
-        content = re.sub(r'\s+', ' ', content.strip())
+        # HTML (RSS/YouTube summaries) goes through the C parser; plain text skips it
+        if '<' in content:
+            try:
+                content = lxml.html.fragment_fromstring(content, create_parent='div').text_content()
+            except (etree.ParserError, ValueError):
+                content = HTML_TAG_RE.sub('', content)
+        
+        # Remove zero-width characters and extra whitespace
+        content = WHITESPACE_RE.sub(' ', ZERO_WIDTH_RE.sub('', content)).strip()
         
         return content[:self.quality_thresholds['max_content_length']]
 
+    @staticmethod
+    def _entry_id(entry) -> Optional[str]:
+        """Stable identity of a feed entry: its guid/id, else its link."""
+        return entry.get('id') or entry.get('link')
+
+    @staticmethod
+    def _published_at(entry) -> Optional[datetime]:
+        """Entry publish time as aware UTC (single C call, no star-unpack), or None."""
+        parsed = entry.get('published_parsed')
+        return datetime.fromtimestamp(calendar.timegm(parsed), timezone.utc) if parsed else None
+
     def _extract_youtube_description(self, entry) -> str:
         """Extract enhanced YouTube video description"""
         description = entry.get('summary', '')
@@ -1031,9 +1170,9 @@ class EnhancedScraperService:
         score += len(description) / 100
         
         # Boost score for recent content
-        if entry.get('published_parsed'):
-            pub_date = datetime(*entry.published_parsed[:6])
-            days_old = (datetime.utcnow() - pub_date).days
+        pub_date = self._published_at(entry)
+        if pub_date:
+            days_old = (datetime.now(timezone.utc) - pub_date).days
             if days_old < 7:
                 score += 50
             elif days_old < 30:
@@ -1066,9 +1205,9 @@ class EnhancedScraperService:
         score += len(content) / 50
         
         # Recent content boost
-        if entry.get('published_parsed'):
-            pub_date = datetime(*entry.published_parsed[:6])
-            days_old = (datetime.utcnow() - pub_date).days
+        pub_date = self._published_at(entry)
+        if pub_date:
+            days_old = (datetime.now(timezone.utc) - pub_date).days
             if days_old < 3:
                 score += 30
             elif days_old < 14:
@@ -1076,73 +1215,67 @@ class EnhancedScraperService:
         
         return min(score, 100.0)
 
-    def _extract_website_title(self, soup: BeautifulSoup) -> str:
+    def _parse_html_sync(self, page: bytes) -> Tuple[str, str]:
+        """Parse a page and extract (title, main content); CPU-bound, run via asyncio.to_thread."""
+        tree = lxml.html.document_fromstring(page)
+        return self._extract_website_title(tree), self._extract_website_content(tree)
+
+    def _extract_website_title(self, tree: lxml.html.HtmlElement) -> str:
         """Extract title from website"""
-        # Try multiple title sources
-        title_candidates = [
-            soup.find('h1'),
-            soup.find('title'),
-            soup.find('meta', attrs={'property': 'og:title'}),
-            soup.find('meta', attrs={'name': 'twitter:title'})
-        ]
-        
-        for candidate in title_candidates:
-            if candidate:
-                if candidate.name == 'meta':
-                    title_text = candidate.get('content', '')
-                else:
-                    title_text = candidate.get_text()
-                
-                if title_text and len(title_text.strip()) > 5:
-                    return title_text.strip()
+        # Try multiple title sources (h1, <title>, og:title, twitter:title)
+        for xpath in WEBSITE_TITLE_XPATHS:
+            title_text = xpath(tree).strip()
+            if len(title_text) > 5:
+                return title_text
         
         return "Untitled Website"
 
-    def _extract_website_description(self, soup: BeautifulSoup) -> str:
+    def _extract_website_description(self, tree: lxml.html.HtmlElement) -> str:
         """Extract description from website"""
-        desc_candidates = [
-            soup.find('meta', attrs={'name': 'description'}),
-            soup.find('meta', attrs={'property': 'og:description'}),
-            soup.find('meta', attrs={'name': 'twitter:description'})
-        ]
-        
-        for candidate in desc_candidates:
-            if candidate:
-                desc_text = candidate.get('content', '')
-                if desc_text and len(desc_text.strip()) > 10:
-                    return desc_text.strip()
+        for xpath in WEBSITE_DESCRIPTION_XPATHS:
+            desc_text = xpath(tree).strip()
+            if len(desc_text) > 10:
+                return desc_text
         
         return ""
 
-    def _extract_website_content(self, soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _element_text(element) -> str:
+        """Whitespace-stripped text fragments of an element joined with spaces."""
+        return ' '.join(text for text in (fragment.strip() for fragment in element.itertext()) if text)
+
+    def _extract_website_content(self, tree: lxml.html.HtmlElement) -> str:
         """Extract main content from website"""
         # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-            element.decompose()
+        for element in WEBSITE_NOISE_XPATH(tree):
+            element.drop_tree()
         
         # Try to find main content area
-        content_candidates = [
-            soup.find('main'),
-            soup.find('article'),
-            soup.find('div', attrs={'class': re.compile(r'content|main|post|article', re.I)}),
-            soup.find('div', attrs={'id': re.compile(r'content|main|post|article', re.I)})
-        ]
-        
-        for candidate in content_candidates:
-            if candidate:
-                text = candidate.get_text(separator=' ', strip=True)
+        for xpath in WEBSITE_CONTENT_XPATHS:
+            candidates = xpath(tree)
+            if candidates:
+                text = self._element_text(candidates[0])
                 if len(text) > 100:
                     return text
         
         # Fallback to body text
-        body = soup.find('body')
-        if body:
-            return body.get_text(separator=' ', strip=True)
-        
-        return soup.get_text(separator=' ', strip=True)
+        body = tree.find('body')
+        return self._element_text(body if body is not None else tree)
     
-    def _get_youtube_rss_url(self, youtube_url: str) -> Optional[str]:
-        """Enhanced YouTube URL to RSS conversion with video-to-channel resolution"""
+    def _get_youtube_channel_id_from_html(self, html: str) -> Optional[str]:
+        """Extract the channel ID from an already downloaded YouTube page"""
+        for pattern in YOUTUBE_CHANNEL_ID_PATTERNS:
+            match = pattern.search(html)
+            if match:
+                return match.group(1)
+        return None
+
+    def _get_youtube_rss_url(self, youtube_url: str, html: Optional[str] = None) -> Optional[str]:
+        """Enhanced YouTube URL to RSS conversion with video-to-channel resolution
+
+        html: optional page HTML of youtube_url; when it contains the channel ID the
+        yt-dlp network round-trip is skipped.
+        """
         try:
             # Handle different YouTube URL formats
             # 1) URL zaten RSS biçimindeyse (feeds/videos.xml) doğrudan döndür
@@ -1155,38 +1288,26 @@ class EnhancedScraperService:
                 playlist_id = youtube_url.split('list=')[-1].split('&')[0]
                 return f"https://www.youtube.com/feeds/videos.xml?playlist_id={playlist_id}"
             elif '/watch?v=' in youtube_url or 'youtu.be/' in youtube_url:
-                # Video URL - extract channel ID using yt-dlp
+                # Video URL - reuse the fetched page if we have it, else extract channel ID using yt-dlp
+                channel_id = self._get_youtube_channel_id_from_html(html) if html else None
+                if channel_id:
+                    return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
                 if YT_DLP_AVAILABLE:
                     try:
-                        ydl_opts = {
-                            'quiet': True,
-                            'no_warnings': True,
-                            'extract_flat': True,
-                        }
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                            info = ydl.extract_info(youtube_url, download=False)
-                            if 'channel_id' in info:
-                                channel_id = info['channel_id']
-                                logger.info(f"Extracted channel ID {channel_id} from video URL")
-                                return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+                        channel_id = _resolve_youtube_channel_id(youtube_url)
+                        return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
                     except Exception as e:
                         logger.warning(f"yt-dlp extraction failed: {e}")
                 return None
             elif '/c/' in youtube_url or '/user/' in youtube_url or 'youtube.com/@' in youtube_url:
-                # Custom/user/@ URLs - try yt-dlp for channel ID resolution
+                # Custom/user/@ URLs - reuse the fetched page if we have it, else try yt-dlp
+                channel_id = self._get_youtube_channel_id_from_html(html) if html else None
+                if channel_id:
+                    return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
                 if YT_DLP_AVAILABLE:
                     try:
-                        ydl_opts = {
-                            'quiet': True,
-                            'no_warnings': True,
-                            'extract_flat': True,
-                        }
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                            info = ydl.extract_info(youtube_url, download=False)
-                            if 'channel_id' in info:
-                                channel_id = info['channel_id']
-                                logger.info(f"Resolved channel ID {channel_id} from custom URL")
-                                return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+                        channel_id = _resolve_youtube_channel_id(youtube_url)
+                        return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
                     except Exception as e:
                         logger.warning(f"yt-dlp channel resolution failed: {e}")
                 return None
@@ -1275,77 +1396,71 @@ class EnhancedScraperService:
                 "database_connection": False
             }
 
-    async def discover_feeds(self, url: str) -> Dict[str, Any]:
-        """Discover RSS/Atom feeds from a website URL using feedparser and manual detection"""
+    async def discover_feeds(self, url: str, page_content: Optional[bytes] = None) -> Dict[str, Any]:
+        """Discover RSS/Atom feeds from a website URL using feedparser and manual detection
+
+        page_content: already downloaded HTML of `url`; when given the page is not fetched again.
+        """
         try:
-            # Manual discovery using BeautifulSoup
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            feeds = []
+            # Manual discovery of <link rel="alternate"> tags with lxml
+            if page_content is None:
+                response = await self.http.get(url, timeout=10)
+                response.raise_for_status()
+                page_content = response.content
+            # Çok MB'lık sayfalarda tam HTML ağacı kurmak event loop'u bloklamasın
+            link_tags = await asyncio.to_thread(_feed_link_attrs, page_content)
             
-            # Look for <link> tags with RSS/Atom feeds
-            link_tags = soup.find_all('link', {'type': ['application/rss+xml', 'application/atom+xml']})
+            # Candidate feed URLs: <link> tags first, then common paths (unique by URL)
+            candidates = {}
             for link in link_tags:
                 href = link.get('href')
                 if href:
                     if not href.startswith('http'):
                         href = urljoin(url, href)
-                    
-                    # Test the feed URL with feedparser
-                    try:
-                        feed_response = self.session.get(href, timeout=5)
-                        if feed_response.status_code == 200:
-                            parsed_feed = feedparser.parse(feed_response.content)
-                            if parsed_feed.feed:
-                                feeds.append({
-                                    'url': href,
-                                    'title': parsed_feed.feed.get('title', link.get('title', 'RSS Feed')),
-                                    'description': parsed_feed.feed.get('description', ''),
-                                    'feed_type': 'rss' if 'rss' in link.get('type', '') else 'atom',
-                                    'score': 90,
-                                    'entries_count': len(parsed_feed.entries)
-                                })
-                    except:
+                    feed_type = 'rss' if 'rss' in link.get('type', '') else 'atom'
+                    candidates.setdefault(href, (link.get('title', 'RSS Feed'), feed_type, True))
+            for path in COMMON_FEED_PATHS:
+                candidates.setdefault(urljoin(url, path), (f'Feed ({path})', 'rss', False))
+            
+            # Probe every candidate concurrently (bounded); feedparser runs in a worker thread, off the event loop
+            probe_slots = asyncio.Semaphore(FEED_PROBE_CONCURRENCY)
+            
+            async def probe(feed_url: str) -> Optional[feedparser.FeedParserDict]:
+                async with probe_slots:
+                    feed_response = await self.http.get(feed_url, timeout=5)
+                if feed_response.status_code != 200 or not _looks_like_feed(feed_response.content):
+                    return None
+                return await asyncio.to_thread(feedparser.parse, feed_response.content)
+            
+            results = await asyncio.gather(*(probe(feed_url) for feed_url in candidates), return_exceptions=True)
+            
+            unique_feeds = []
+            for (feed_url, (fallback_title, feed_type, from_link_tag)), parsed_feed in zip(candidates.items(), results):
+                try:
+                    if isinstance(parsed_feed, Exception):
+                        raise parsed_feed
+                    if parsed_feed is None:
+                        continue
+                    if parsed_feed.feed:
+                        unique_feeds.append({
+                            'url': feed_url,
+                            'title': parsed_feed.feed.get('title', fallback_title),
+                            'description': parsed_feed.feed.get('description', ''),
+                            'feed_type': feed_type,
+                            'score': 90 if from_link_tag else 80,
+                            'entries_count': len(parsed_feed.entries)
+                        })
+                except Exception:
+                    if from_link_tag:
                         # Add even if we can't parse it, might work later
-                        feeds.append({
-                            'url': href,
-                            'title': link.get('title', 'RSS Feed'),
+                        unique_feeds.append({
+                            'url': feed_url,
+                            'title': fallback_title,
                             'description': '',
-                            'feed_type': 'rss' if 'rss' in link.get('type', '') else 'atom',
+                            'feed_type': feed_type,
                             'score': 70
                         })
             
-            # Look for common feed URLs
-            common_paths = ['/rss', '/feed', '/atom.xml', '/rss.xml', '/feed.xml', '/feeds/all.atom.xml']
-            for path in common_paths:
-                test_url = urljoin(url, path)
-                try:
-                    test_response = self.session.get(test_url, timeout=5)
-                    if test_response.status_code == 200:
-                        # Test with feedparser
-                        parsed_feed = feedparser.parse(test_response.content)
-                        if parsed_feed.feed:
-                            feeds.append({
-                                'url': test_url,
-                                'title': parsed_feed.feed.get('title', f'Feed ({path})'),
-                                'description': parsed_feed.feed.get('description', ''),
-                                'feed_type': 'rss',
-                                'score': 80,
-                                'entries_count': len(parsed_feed.entries)
-                            })
-                except:
-                    continue
-            
-            # Remove duplicates based on URL
-            unique_feeds = []
-            seen_urls = set()
-            for feed in feeds:
-                if feed['url'] not in seen_urls:
-                    unique_feeds.append(feed)
-                    seen_urls.add(feed['url'])
-            
             # Sort by score
             unique_feeds.sort(key=lambda x: x.get('score', 0), reverse=True)
             
@@ -1364,40 +1479,35 @@ class EnhancedScraperService:
             }
 
     # Helper methods for platform-specific content extraction
+    @staticmethod
+    def _first_path_segment(url: str, domains: Tuple[str, ...]) -> Optional[str]:
+        """First path segment of `url` if its host is one of `domains` (or a subdomain), else None."""
+        parsed = urlparse(url if '//' in url else f'//{url}')
+        host = (parsed.hostname or '').lower()
+        if not any(host == domain or host.endswith('.' + domain) for domain in domains):
+            return None
+        return parsed.path.strip('/').split('/', 1)[0] or None
+
     def _extract_instagram_profile(self, url: str) -> Optional[str]:
         """Extract Instagram profile name from URL"""
-        patterns = [
-            r'instagram\.com/([^/?]+)',
-            r'instagram\.com/p/([^/?]+)',  # For individual post URLs
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                profile_name = match.group(1)
-                # Handle post URLs - extract profile differently
-                if '/p/' in url:
-                    return None  # Can't easily get profile from post URL
-                return profile_name
-        return None
+        profile_name = self._first_path_segment(url, ('instagram.com',))
+        if profile_name == 'p':
+            return None  # Can't easily get profile from post URL
+        return profile_name
     
     def _extract_twitter_username(self, url: str) -> Optional[str]:
         """Extract Twitter username from URL"""
-        patterns = [
-            r'twitter\.com/([^/?]+)',
-            r'x\.com/([^/?]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                username = match.group(1)
-                # Filter out non-username paths
-                if username.lower() in ['home', 'search', 'explore', 'notifications', 'messages', 'i', 'settings']:
-                    continue
-                return username
-        return None
+        username = self._first_path_segment(url, ('twitter.com', 'x.com'))
+        # Filter out non-username paths
+        if username and username.lower() in TWITTER_RESERVED_PATHS:
+            return None
+        return username
     
+    def _fetch_instagram_posts(self, profile_name: str, limit: int) -> list:
+        """Fetch the latest `limit` posts without draining the paginated generator (blocking)."""
+        profile = instaloader.Profile.from_username(self.instagram_loader.context, profile_name)
+        return list(itertools.islice(profile.get_posts(), limit))
+
     def _calculate_instagram_popularity(self, post) -> float:
         """Calculate popularity score for Instagram content"""
         score = 0.0
@@ -1412,7 +1522,7 @@ class EnhancedScraperService:
         
         # Recent posts get a boost
         if hasattr(post, 'date_utc'):
-            days_old = (datetime.utcnow() - post.date_utc).days
+            days_old = (datetime.now(timezone.utc) - post.date_utc.replace(tzinfo=timezone.utc)).days  # Instaloader: naive UTC
             if days_old < 1:
                 score += 20
             elif days_old < 7:
@@ -1451,7 +1561,7 @@ class EnhancedScraperService:
         """
         try:
             rss_url = f"https://nitter.net/{username}/rss"
-            feed = feedparser.parse(rss_url)
+            feed = await self._fetch_feed(rss_url)
 
             if not feed.entries:
                 return ScrapingResult(
@@ -1461,7 +1571,7 @@ class EnhancedScraperService:
                     error="Nitter RSS boş döndü veya erişilemedi"
                 )
 
-            new_items = 0
+            candidates = []
             processed = 0
 
             for entry in feed.entries[:10]:
@@ -1475,33 +1585,20 @@ class EnhancedScraperService:
                 link = entry.get('link', source.url)
                 content_hash = self._generate_content_hash(title, link)
 
-                async with get_db() as db:
-                    existing = await db.execute(
-                        select(Topic).where(
-                            (Topic.link == link) |
-                            (Topic.description == content_hash)
-                        )
-                    )
-                    if existing.scalar_one_or_none():
-                        continue
-
-                topic = Topic(
+                topic = dict(
                     title=self._clean_title(title),
-                    description=content_hash,
+                    content_hash=content_hash,
                     content=self._clean_content(content),
                     platform="Twitter",
                     source=source.name,
                     link=link,
-                    publish_date=datetime(*entry.published_parsed[:6]) if entry.get('published_parsed') else datetime.utcnow(),
+                    publish_date=self._published_at(entry) or datetime.now(timezone.utc),
                     popularity_score=self._calculate_rss_popularity(entry),
                     content_length=len(content)
                 )
+                candidates.append(topic)
 
-                async with get_db() as db:
-                    db.add(topic)
-                    await db.commit()
-
-                new_items += 1
+            new_items = await self._save_topics(source, candidates)
 
             return ScrapingResult(
                 success=True,
@@ -1536,7 +1633,7 @@ class EnhancedScraperService:
                 'new_content_items': getattr(self, 'last_new_content', 0)
             },
             'session_info': {
-                'session_active': hasattr(self, 'session') and self.session is not None,
+                'session_active': not self.http.is_closed,
                 'twitter_logged_in': getattr(self, 'twitter_logged_in', False),
                 'instagram_logged_in': getattr(self, 'instagram_logged_in', False)
             },
@@ -11,25 +11,25 @@ Modern FastAPI + SQLite + AI Backend
 - Otomatik OpenAPI documentation
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 import uvicorn
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 import sys
 from contextlib import asynccontextmanager
 
 # Local imports
-from app.database import init_database, get_db
+from app.database import init_database, get_db, engine
 from app.models import Topic, Source, AIContent
 from app.services.scraper_service import scraper_service
 from app.services.ai_service import AIService
 from app.services.scheduler_service import SchedulerService
 from app.api import topics, sources, ai_content, stats, settings as settings_api
 from app.api import twitter_auth
-from app.core.config import get_settings
+from app.core.config import get_settings, ensure_data_directory
 
 # Logging setup - production ready
 settings = get_settings()
@@ -57,10 +57,14 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Content Manager API v2.0.0 başlatılıyor...")
     
-    # Initialize database
+    # Initialize database (SQLite dosyası data/ altında)
+    ensure_data_directory()
     await init_database()
     logger.info("✅ Database başlatıldı")
     
+    # Shared AI service (Gemini model handle reused across requests)
+    app.state.ai_service = AIService()
+    
     # Start scheduler
     scheduler_service = SchedulerService()
     await scheduler_service.start()
@@ -71,6 +75,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     if scheduler_service:
         await scheduler_service.stop()
+    await sources.close_http_client()
+    await scraper_service.close()
+    await engine.dispose()  # Havuzdaki bağlantıları kapat
     logger.info("📴 Content Manager API kapandı")
 
 # FastAPI app instance with production configuration
@@ -107,7 +114,7 @@ async def root():
         "name": "Content Manager API",
         "version": "2.0.0",
         "status": "🟢 Active",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "features": [
             "🕘 Otomatik sabah kazıma (07:00)",
             "👆 Swipe-based content değerlendirme", 
@@ -126,7 +133,7 @@ async def root():
 async def health_check():
     """Enhanced health check endpoint for production monitoring"""
     try:
-        start_time = datetime.now()
+        start_time = datetime.now(timezone.utc)
         
         # Test database connection
         async with get_db() as db:
@@ -139,11 +146,11 @@ async def health_check():
         scheduler_running = scheduler_service and scheduler_service.is_running()
         
         # Calculate response time
-        response_time = (datetime.now() - start_time).total_seconds() * 1000
+        response_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
         
         health_data = {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "version": "2.0.0",
             "uptime": "running",
             "services": {
@@ -173,7 +180,7 @@ async def health_check():
             content={
                 "status": "unhealthy", 
                 "error": str(e) if not settings.production_mode else "Service unavailable",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "services": {
                     "database": "🔴 Connection Failed",
                     "scheduler": "❓ Unknown",
@@ -184,11 +191,17 @@ async def health_check():
         )
 
 @app.post("/api/scrape/trigger")
-async def trigger_manual_scrape(background_tasks: BackgroundTasks):
+async def trigger_manual_scrape():
     """Enhanced manuel kazıma tetikleme"""
     try:
         logger.info("🚀 Manual scrape triggered by user")
         
+        # Zamanlanmış ya da önceki manuel kazıma sürüyorsa ikinci bir tane başlatma
+        if not scheduler_service:
+            raise HTTPException(status_code=503, detail="Scheduler hazır değil")
+        if scheduler_service.is_scrape_in_progress():
+            raise HTTPException(status_code=409, detail="Kazıma zaten çalışıyor")
+        
         # Reset scraping status
         scraper_service.scraping_status = {
             "status": "starting",
@@ -196,17 +209,19 @@ async def trigger_manual_scrape(background_tasks: BackgroundTasks):
             "current_source": "Initializing...",
             "new_content_count": 0,
             "errors": [],
-            "start_time": datetime.now().isoformat(),
+            "start_time": datetime.now(timezone.utc).isoformat(),
             "end_time": None,
             "duration": 0
         }
         
-        background_tasks.add_task(scraper_service.scrape_all_sources)
+        trigger_result = await scheduler_service.trigger_manual_scrape()
+        if not trigger_result.get("success"):
+            raise Exception(trigger_result.get("error", "Unknown error"))
         
         return {
             "success": True,
             "message": "🚀 Gelişmiş kazıma sistemi başlatıldı",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "status": "started",
             "features": [
                 "🎯 Akıllı içerik filtreleme",
@@ -216,6 +231,8 @@ async def trigger_manual_scrape(background_tasks: BackgroundTasks):
                 "🛡️ Production-ready error handling"
             ]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Enhanced scrape error: {e}", exc_info=True)
         scraper_service.scraping_status["status"] = "failed"
@@ -241,12 +258,12 @@ async def get_scrape_status():
         # Calculate duration if running
         if status.get("start_time") and not status.get("end_time"):
             start_time = datetime.fromisoformat(status["start_time"])
-            status["duration"] = int((datetime.now() - start_time).total_seconds())
+            status["duration"] = int((datetime.now(timezone.utc) - start_time).total_seconds())
         
         return {
             "success": True,
             "data": status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
     except Exception as e:
@@ -254,7 +271,7 @@ async def get_scrape_status():
         return {
             "success": False,
             "error": "Status bilgisi alınamadı",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
 # Enhanced global exception handler with production considerations
@@ -273,7 +290,7 @@ async def global_exception_handler(request, exc):
         content={
             "success": False,
             "error": error_detail,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "path": str(request.url.path) if not settings.production_mode else None
         }
     )
@@ -293,5 +310,6 @@ if __name__ == "__main__":
         reload=not production,  # Disable reload in production
         log_level=settings.log_level.lower(),
         access_log=not production,  # Disable access log in production for performance
+        loop="auto",  # uvloop (uvicorn[standard]) varsa onu kullanır; Windows'ta standart asyncio loop
         workers=1 if not production else 4  # Multiple workers in production
     ) 
\ No newline at end of file